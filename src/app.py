@@ -1,42 +1,182 @@
-from flask import Flask, render_template, jsonify, send_file
-import json
-import pandas as pd
+from flask import Flask, render_template, jsonify, request, Response
+import csv
+import gzip
+import hashlib
+import os
+import threading
+import zlib
 import io
 from datetime import datetime
+from typing import List, NamedTuple
+from company_index import CompaniesIndex, MAX_PAGE_SIZE
+from config import LEAD_STORE_PATH
+from lead_store import LeadStore
 
 app = Flask(__name__)
 
-def load_companies():
-    with open('discovered_companies.json', 'r') as f:
-        return json.load(f)
+class CompaniesSnapshot(NamedTuple):
+    companies: List[dict]
+    body: bytes  # serialized JSON response
+    gzip_body: bytes
+    etag: str
+    gzip_etag: str
+    index: CompaniesIndex
+
+class CompaniesCache:
+    """Loaded, serialized and gzipped copy of the lead store.
+
+    Reloaded only when the database file's mtime or size changes, so
+    requests between discovery runs cost a stat() instead of a query and dump.
+    """
+
+    def __init__(self, path: str = LEAD_STORE_PATH):
+        self.path = path
+        self._lock = threading.Lock()
+        self._stamp = None
+        self._snapshot = None
+
+    def get(self) -> CompaniesSnapshot:
+        stat = os.stat(self.path)
+        stamp = (stat.st_mtime_ns, stat.st_size)
+        if stamp != self._stamp:
+            with self._lock:
+                if stamp != self._stamp:
+                    self._snapshot = self._load()
+                    self._stamp = stamp
+        return self._snapshot
+
+    def _load(self) -> CompaniesSnapshot:
+        with LeadStore(self.path) as store:
+            companies = list(store.iter_companies())
+        body = (app.json.dumps(companies) + '\n').encode('utf-8')
+        digest = hashlib.sha256(body).hexdigest()[:32]
+        return CompaniesSnapshot(
+            companies=companies,
+            body=body,
+            gzip_body=gzip.compress(body, mtime=0),
+            etag=digest,
+            gzip_etag=f"{digest}-gzip",
+            index=CompaniesIndex(companies)
+        )
+
+companies_cache = CompaniesCache()
+
+def cached_response(body: bytes, etag: str, gzip_body: bytes, gzip_etag: str,
+                    mimetype: str) -> Response:
+    """Serve `body` (or its gzip copy) with a strong ETag, or a 304 when it matches"""
+    use_gzip = 'gzip' in request.accept_encodings
+    if use_gzip:
+        body, etag = gzip_body, gzip_etag
+    
+    if request.if_none_match.contains_weak(etag):
+        response = Response(status=304)
+    else:
+        response = Response(body, mimetype=mimetype)
+        if use_gzip:
+            response.headers['Content-Encoding'] = 'gzip'
+    response.set_etag(etag)
+    response.headers['Vary'] = 'Accept-Encoding'
+    response.headers['Cache-Control'] = 'no-cache'
+    return response
 
 @app.route('/')
 def index():
     return render_template('index.html')
 
+def query_args() -> dict:
+    """Listing filters from the query string"""
+    return {
+        'area': request.args.get('area'),
+        'type': request.args.get('type'),
+        'min_rating': request.args.get('min_rating', type=float),
+        'min_reviews': request.args.get('min_reviews', type=int)
+    }
+
 @app.route('/api/companies')
 def get_companies():
-    companies = load_companies()
-    return jsonify(companies)
+    snapshot = companies_cache.get()
+    if not request.args:
+        # Unparameterized requests keep getting the whole list
+        return cached_response(snapshot.body, snapshot.etag, snapshot.gzip_body,
+                               snapshot.gzip_etag, 'application/json')
+    
+    # Pages only change when the file does, so revalidation skips the query
+    query = request.query_string.decode('utf-8')
+    etag = f"{snapshot.etag}-{hashlib.sha256(query.encode('utf-8')).hexdigest()[:16]}"
+    if request.if_none_match.contains_weak(etag):
+        response = Response(status=304)
+    else:
+        # Clamped here so the echoed values match the rows returned
+        page = max(request.args.get('page', 1, type=int), 1)
+        page_size = min(max(request.args.get('page_size', 50, type=int), 1), MAX_PAGE_SIZE)
+        try:
+            result = snapshot.index.query(
+                page=page,
+                page_size=page_size,
+                sort=request.args.get('sort', '-reviews'),
+                **query_args()
+            )
+        except ValueError as e:
+            return jsonify({'error': str(e)}), 400
+        response = jsonify({
+            'companies': result.companies,
+            'total': result.total,
+            'page': page,
+            'page_size': page_size,
+            'facets': snapshot.index.facets()
+        })
+    response.set_etag(etag)
+    response.headers['Cache-Control'] = 'no-cache'
+    return response
+
+CSV_ROWS_PER_CHUNK = 500
+
+def iter_csv(companies, columns: List[str]):
+    """Render rows into CSV text a chunk at a time"""
+    buffer = io.StringIO()
+    writer = csv.DictWriter(buffer, fieldnames=columns, extrasaction='ignore', lineterminator='\n')
+    writer.writeheader()
+    for n, company in enumerate(companies, 1):
+        writer.writerow(company)
+        if n % CSV_ROWS_PER_CHUNK == 0:
+            yield buffer.getvalue().encode('utf-8')
+            buffer.seek(0)
+            buffer.truncate()
+    yield buffer.getvalue().encode('utf-8')
+
+def iter_gzip(chunks):
+    compressor = zlib.compressobj(wbits=31)  # gzip container
+    for chunk in chunks:
+        data = compressor.compress(chunk)
+        if data:
+            yield data
+    yield compressor.flush()
 
 @app.route('/api/export-csv')
 def export_csv():
-    companies = load_companies()
-    df = pd.DataFrame(companies)
-    
-    # Create CSV in memory
-    output = io.StringIO()
-    df.to_csv(output, index=False)
+    index = companies_cache.get().index
+    columns = index.columns
+    if request.args.get('columns'):
+        columns = request.args['columns'].split(',')
+        unknown = [c for c in columns if c not in index.columns]
+        if unknown:
+            return jsonify({'error': f"Unknown columns: {', '.join(unknown)}"}), 400
+    try:
+        companies = index.iter_matches(sort=request.args.get('sort'), **query_args())
+        chunks = iter_csv(companies, columns)
+        first = next(chunks)  # surface a bad sort key before streaming starts
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
     
-    # Create the response
-    mem_file = io.BytesIO()
-    mem_file.write(output.getvalue().encode('utf-8'))
-    mem_file.seek(0)
+    def generate():
+        yield first
+        yield from chunks
     
+    use_gzip = 'gzip' in request.accept_encodings
     timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
-    return send_file(
-        mem_file,
-        mimetype='text/csv',
-        as_attachment=True,
-        download_name=f'companies_{timestamp}.csv'
-    ) 
\ No newline at end of file
+    response = Response(iter_gzip(generate()) if use_gzip else generate(), mimetype='text/csv')
+    response.headers['Content-Disposition'] = f'attachment; filename=companies_{timestamp}.csv'
+    response.headers['Vary'] = 'Accept-Encoding'
+    if use_gzip:
+        response.headers['Content-Encoding'] = 'gzip'
+    return response
@@ -0,0 +1,158 @@
+"""Compare the single-pass extract_page against the original multi-pass one.
+
+Usage: PYTHONPATH=src python src/bench_extractor.py [page.html ...] [--parsers html.parser lxml]
+
+Every page is parsed once per backend, both extractors run on the same
+tree, and any difference in their output is reported.
+"""
+import argparse
+import re
+import time
+from typing import Dict, List
+from urllib.parse import urljoin
+from bs4 import BeautifulSoup, FeatureNotFound
+from scanners.contact_scanner import extract_page
+
+# The extractor as it was before the single-pass rewrite, kept verbatim for comparison
+def legacy_is_contact_form(form: BeautifulSoup) -> bool:
+    contact_indicators = ['contact', 'email', 'message', 'name', 'phone']
+    action = form.get('action', '').lower()
+    if any(ind in action for ind in ['contact', 'enquiry', 'feedback']):
+        return True
+    inputs = form.find_all(['input', 'textarea'])
+    input_names = [i.get('name', '').lower() for i in inputs]
+    if any(ind in ' '.join(input_names) for ind in contact_indicators):
+        return True
+    return False
+
+def legacy_extract_contact_info(soup: BeautifulSoup, contacts: Dict):
+    text = soup.get_text()
+    emails = re.findall(r'[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}', text)
+    contacts['emails'].extend(list(set(emails)))
+    phones = re.findall(r'\(?\d{3}\)?[-.\s]?\d{3}[-.\s]?\d{4}', text)
+    contacts['phones'].extend(list(set(phones)))
+    social_patterns = {
+        'linkedin': r'linkedin\.com/(?:company|in)/',
+        'facebook': r'facebook\.com/',
+        'twitter': r'twitter\.com/',
+        'instagram': r'instagram\.com/',
+        'youtube': r'youtube\.com/'
+    }
+    for platform, pattern in social_patterns.items():
+        links = soup.find_all('a', href=re.compile(pattern))
+        if links:
+            contacts['social_media'].append({
+                'platform': platform,
+                'url': links[0]['href']
+            })
+    hours_keywords = ['hours', 'schedule', 'timing', 'open']
+    for keyword in hours_keywords:
+        hours_section = soup.find(class_=re.compile(keyword, re.I))
+        if hours_section:
+            contacts['business_hours'] = hours_section.get_text(strip=True)
+            break
+
+def legacy_extract_page(soup: BeautifulSoup, url: str) -> Dict:
+    page = {
+        'emails': [],
+        'phones': [],
+        'social_media': [],
+        'business_hours': None,
+        'contact_link': None,
+        'forms': []
+    }
+    legacy_extract_contact_info(soup, page)
+    contact_links = soup.find_all('a', href=re.compile(r'contact|about', re.I))
+    if contact_links:
+        page['contact_link'] = urljoin(url, contact_links[0]['href'])
+    for form in soup.find_all('form'):
+        if legacy_is_contact_form(form):
+            page['forms'].append({
+                'action': form.get('action', ''),
+                'method': form.get('method', 'post'),
+                'fields': [i.get('name', '') for i in form.find_all('input')]
+            })
+    return page
+
+def sample_page(n: int) -> str:
+    """A synthetic small-business homepage with n repeated content blocks"""
+    blocks = []
+    for i in range(n):
+        blocks.append(f"""
+        <div class="section section-{i}">
+          <h2>Service {i}</h2>
+          <p>Call us at (619) 555-{1000 + i:04d} or write to team{i}@example.com.</p>
+          <p class="note">Open for <b>walk-ins</b> on weekends.</p>
+          <a href="/services/{i}">Details</a>
+          <a href="https://www.facebook.com/page{i}">Facebook</a>
+          <!-- old contact: hidden{i}@example.com -->
+          <script>var email = "script{i}@example.com";</script>
+        </div>""")
+    return f"""<!DOCTYPE html>
+<html><head><title>Acme Plumbing</title><style>.hours {{ color: red }}</style></head>
+<body>
+  <nav><a href="/about-us">About</a> <a href="/contact">Contact</a></nav>
+  {''.join(blocks)}
+  <div class="store-Schedule">Mon-Fri 8-6</div>
+  <div class="hours footer">Mon-Sat <span>9-5</span></div>
+  <a href="https://linkedin.com/company/acme">LinkedIn</a>
+  <a href="https://twitter.com/acme">Twitter</a>
+  <a href="https://youtube.com/acme">YouTube</a>
+  <form action="/subscribe"><input name="Email"><button>Go</button></form>
+  <form action="/search"><input name="q"></form>
+  <form action="/contact-us" method="get">
+    <input name="full_name"><textarea name="body"></textarea>
+    <form action="/inner"><input name="phone"></form>
+  </form>
+</body></html>"""
+
+def bench(label: str, extractor, soup: BeautifulSoup, url: str, repeat: int) -> float:
+    start = time.perf_counter()
+    for _ in range(repeat):
+        extractor(soup, url)
+    return (time.perf_counter() - start) / repeat
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark extract_page against the legacy extractor")
+    parser.add_argument('pages', nargs='*', help="HTML files (defaults to synthetic pages)")
+    parser.add_argument('--parsers', nargs='+', default=['html.parser', 'lxml'])
+    parser.add_argument('--repeat', type=int, default=20)
+    args = parser.parse_args()
+
+    pages: List = []
+    for path in args.pages:
+        with open(path, 'rb') as f:
+            pages.append((path, f.read()))
+    if not pages:
+        pages = [(f"synthetic-{n}", sample_page(n).encode('utf-8')) for n in (1, 50, 500)]
+
+    mismatches = 0
+    for backend in args.parsers:
+        try:
+            BeautifulSoup('', backend)
+        except FeatureNotFound:
+            print(f"⏭️  {backend}: not installed, skipped")
+            continue
+        for name, body in pages:
+            soup = BeautifulSoup(body, backend)
+            url = 'https://example.com/'
+            expected = legacy_extract_page(soup, url)
+            actual = extract_page(soup, url)
+            actual = {key: actual[key] for key in expected}  # 'links' is new
+            if actual != expected:
+                mismatches += 1
+                print(f"❌ {backend} {name}: outputs differ")
+                for key in expected:
+                    if expected[key] != actual[key]:
+                        print(f"   {key}: legacy={expected[key]!r} new={actual[key]!r}")
+                continue
+            legacy = bench('legacy', legacy_extract_page, soup, url, args.repeat)
+            single = bench('single', extract_page, soup, url, args.repeat)
+            print(f"✅ {backend:12} {name:20} legacy {legacy * 1000:8.2f}ms  "
+                  f"single-pass {single * 1000:8.2f}ms  ({legacy / single:.1f}x)")
+
+    if mismatches:
+        raise SystemExit(f"{mismatches} page(s) differ")
+
+if __name__ == "__main__":
+    main()
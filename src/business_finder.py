@@ -1,10 +1,12 @@
 import asyncio
 import aiohttp
-from typing import List, Dict
-import json
+from typing import AsyncIterator, List, Dict, Optional, Set
 from bs4 import BeautifulSoup
-from config import get_openai_client
-import requests
+from config import get_openai_client, REFRESH_CATEGORIES, PIN_CATEGORIES, LEAD_STORE_PATH
+from category_cache import generate_categories
+from yelp_client import YelpClient, YELP_PAGE_SIZE, YELP_MAX_RESULTS, YELP_MAX_RADIUS
+from geo_tiles import Circle, Tile, tiles_within_radius
+from lead_store import LeadStore
 from urllib.parse import urljoin
 import os
 from dotenv import load_dotenv
@@ -16,6 +18,7 @@ class BusinessFinder:
         self.openai = get_openai_client()
         self.yelp_api_key = os.getenv('YELP_API_KEY')
         print(f"Debug - API Key loaded: {self.yelp_api_key[:10]}... (length: {len(self.yelp_api_key) if self.yelp_api_key else 0})")
+        self.yelp = YelpClient(self.yelp_api_key)
         self.target_areas = [
             {'city': 'San Diego', 'state': 'CA'},
             {'city': 'La Jolla', 'state': 'CA'},
@@ -28,9 +31,15 @@ class BusinessFinder:
             {'city': 'UTC', 'state': 'CA'},
             {'city': 'Mission Valley', 'state': 'CA'}
         ]
+        # Bounding boxes for tiled discovery: San Diego metro, Imperial Beach to Carlsbad
+        self.search_regions = [
+            Tile(south=32.53, west=-117.32, north=33.22, east=-116.90)
+        ]
+        self.min_tile_radius = 1000  # meters; smaller tiles are searched even if saturated
         
-    def get_business_categories(self) -> List[str]:
-        """Generate business categories for mid-sized companies"""
+    def get_business_categories(self, refresh: bool = REFRESH_CATEGORIES,
+                                pin: bool = PIN_CATEGORIES) -> List[str]:
+        """Generate business categories for mid-sized companies (cached, see category_cache)"""
         prompt = """Generate 20 specific Yelp search terms for established businesses in San Diego area.
         Focus on businesses that:
         1. Have 10-200 employees
@@ -58,95 +67,177 @@ class BusinessFinder:
         - Personal services
         - Very small businesses"""
         
-        response = self.openai.chat.completions.create(
-            model="gpt-3.5-turbo",
-            messages=[{"role": "user", "content": prompt}]
-        )
-        
-        categories = response.choices[0].message.content.strip().split('\n')
-        return [c.strip() for c in categories]
+        return generate_categories(self.openai, prompt, model="gpt-3.5-turbo",
+                                   refresh=refresh, pin=pin)
 
-    async def search_yelp(self, category: str, location: Dict) -> List[Dict]:
-        """Search Yelp API for businesses"""
-        companies = []
-        
-        try:
-            api_key = self.yelp_api_key.strip()
-            headers = {
-                'Authorization': f'Bearer {api_key}'  # Just use the key directly
-            }
-            url = 'https://api.yelp.com/v3/businesses/search'
+    def _to_company(self, business: Dict, category: str, location: Dict) -> Optional[Dict]:
+        """Map a Yelp business to a company record, or None if it doesn't qualify"""
+        if (business.get('url') and 
+            business.get('review_count', 0) >= 25 and  # More reviews suggest established business
+            not any(chain in business['name'].lower() 
+                   for chain in ['walmart', 'target', 'costco', 'amazon', 'starbucks', 
+                               'mcdonalds', 'subway', 'enterprise', 'hertz']) and
+            not any(term in business['name'].lower()
+                   for term in ['franchise', 'chain', 'inc.', 'corporation'])):
             
-            # More targeted parameters
-            params = {
-                'term': category,
-                'location': f"{location['city']}, {location['state']}",
-                'limit': 50,
-                'sort_by': 'review_count',
-                'radius': 40000,
-                'price': '3,4'  # Focus on higher-end businesses
+            return {
+                'name': business['name'],
+                'website': business['url'],
+                'address': ', '.join(business['location']['display_address']),
+                'phone': business.get('phone', ''),
+                'type': category,
+                'area': f"{location['city']}, {location['state']}",
+                'rating': business.get('rating', 0),
+                'reviews': business.get('review_count', 0),
+                'price': business.get('price', ''),
+                'source': 'yelp'
             }
-            
-            print(f"  🔍 Searching for {category} in {location['city']}...")
-            response = requests.get(url, headers=headers, params=params)
-            
-            if response.status_code != 200:
-                print(f"  ❌ Yelp API error ({response.status_code}): {response.text}")
-                return companies
+        return None
+
+    async def iter_yelp(self, category: str, location: Dict, seen: Optional[Set[str]] = None) -> AsyncIterator[Dict]:
+        """Stream qualifying businesses from Yelp page by page.
 
-            data = response.json()
-            total = data.get('total', 0)
-            print(f"  📊 Found {total} total results")
+        `seen` holds websites already found in this run and is updated as
+        companies are yielded. Paging stops once a page adds nothing new.
+        """
+        seen = set() if seen is None else seen
+        # More targeted parameters
+        params = {
+            'term': category,
+            'location': f"{location['city']}, {location['state']}",
+            'sort_by': 'review_count',
+            'radius': 40000,
+            'price': '3,4'  # Focus on higher-end businesses
+        }
+        
+        print(f"  🔍 Searching for {category} in {location['city']}...")
+        first_page = True
+        async for data in self.yelp.iter_pages(params):
+            if first_page:
+                print(f"  📊 Found {data.get('total', 0)} total results")
+                first_page = False
             
+            new_companies = 0
             for business in data.get('businesses', []):
-                if (business.get('url') and 
-                    business.get('review_count', 0) >= 25 and  # More reviews suggest established business
-                    not any(chain in business['name'].lower() 
-                           for chain in ['walmart', 'target', 'costco', 'amazon', 'starbucks', 
-                                       'mcdonalds', 'subway', 'enterprise', 'hertz']) and
-                    not any(term in business['name'].lower()
-                           for term in ['franchise', 'chain', 'inc.', 'corporation'])):
-                    
-                    company = {
-                        'name': business['name'],
-                        'website': business['url'],
-                        'address': ', '.join(business['location']['display_address']),
-                        'phone': business.get('phone', ''),
-                        'type': category,
-                        'area': f"{location['city']}, {location['state']}",
-                        'rating': business.get('rating', 0),
-                        'reviews': business.get('review_count', 0),
-                        'price': business.get('price', ''),
-                        'source': 'yelp'
-                    }
-                    companies.append(company)
+                company = self._to_company(business, category, location)
+                if company and company['website'] not in seen:
+                    seen.add(company['website'])
+                    new_companies += 1
                     print(f"  ✅ Found: {company['name']} ({company['reviews']} reviews)")
-            
-        except Exception as e:
-            print(f"  ❌ Error searching {category} in {location['city']}: {str(e)}")
-            
+                    yield company
+            if new_companies == 0:
+                break
+
+    def _new_companies(self, data: Dict, category: str, seen: Set[str]) -> List[Dict]:
+        """Qualifying businesses in one Yelp page not already in `seen` (which is updated)"""
+        companies = []
+        for business in data.get('businesses', []):
+            company = self._to_company(business, category, business['location'])
+            if company and company['website'] not in seen:
+                seen.add(company['website'])
+                print(f"  ✅ Found: {company['name']} ({company['reviews']} reviews)")
+                companies.append(company)
         return companies
 
-    async def find_businesses(self, limit: int = 200) -> List[Dict]:
-        """Find businesses using multiple sources"""
-        all_companies = []
+    async def iter_tile(self, category: str, tile: Tile, seen: Set[str],
+                        covered: List[Circle]) -> AsyncIterator[Dict]:
+        """Stream qualifying businesses found around `tile`.
+
+        Each query searches the circle covering the tile. A tile whose query
+        hits Yelp's result ceiling keeps that first page and is split into
+        quarters, each searched in turn. Tiles lying inside a circle already
+        searched without saturating (listed in `covered`) are skipped.
+        """
+        if any(done.covers(tile) for done in covered):
+            return
+        lat, lng = tile.center
+        radius = min(tile.radius, YELP_MAX_RADIUS)
+        params = {
+            'term': category,
+            'latitude': round(lat, 6),
+            'longitude': round(lng, 6),
+            'radius': radius,
+            'sort_by': 'review_count',
+            'price': '3,4'  # Focus on higher-end businesses
+        }
+        
+        first_page = await self.yelp.search({**params, 'limit': YELP_PAGE_SIZE, 'offset': 0})
+        if first_page is None:
+            return
+        total = first_page.get('total', 0)
+        if total > YELP_MAX_RESULTS and tile.radius > self.min_tile_radius:
+            print(f"  🔀 {category}: {total} results within {radius}m of {lat:.3f},{lng:.3f}, splitting")
+            for company in self._new_companies(first_page, category, seen):
+                yield company
+            for quarter in tile.split():
+                async for company in self.iter_tile(category, quarter, seen, covered):
+                    yield company
+            return
+        
+        covered.append(Circle((lat, lng), radius))
+        print(f"  🔍 {category}: {total} results within {radius}m of {lat:.3f},{lng:.3f}")
+        async for data in self.yelp.iter_pages(params, first_page=first_page):
+            new_companies = self._new_companies(data, category, seen)
+            for company in new_companies:
+                yield company
+            if not new_companies:
+                break
+
+    async def find_businesses(self, limit: int = 200, mode: str = 'tiles') -> List[Dict]:
+        """Find businesses using multiple sources.
+
+        `mode='tiles'` covers `search_regions` with adaptive lat/long tiles;
+        `mode='areas'` sweeps the city names in `target_areas`.
+        """
+        unique_companies = {}
+        seen = set()
         categories = self.get_business_categories()
         
         print("🔍 Generated search terms:")
         for cat in categories:
             print(f"  • {cat}")
         
-        for location in self.target_areas:
-            print(f"\n📍 Searching in {location['city']}...")
-            for category in categories:
-                companies = await self.search_yelp(category, location)
-                all_companies.extend(companies)
-                await asyncio.sleep(1)  # Rate limiting
+        async def collect_area(category: str, location: Dict):
+            try:
+                async for company in self.iter_yelp(category, location, seen):
+                    unique_companies[company['website']] = company
+            except Exception as e:
+                print(f"  ❌ Error searching {category} in {location['city']}: {str(e)}")
+        
+        async def collect_tiles(category: str):
+            covered = []
+            for region in self.search_regions:
+                for tile in tiles_within_radius(region, YELP_MAX_RADIUS):
+                    try:
+                        async for company in self.iter_tile(category, tile, seen, covered):
+                            unique_companies[company['website']] = company
+                    except Exception as e:
+                        lat, lng = tile.center
+                        print(f"  ❌ Error searching {category} around {lat:.3f},{lng:.3f}: {str(e)}")
+        
+        if mode == 'tiles':
+            searches = [collect_tiles(category) for category in categories]
+        elif mode == 'areas':
+            searches = [
+                collect_area(category, location)
+                for location in self.target_areas
+                for category in categories
+            ]
+        else:
+            raise ValueError(f"Unknown discovery mode: {mode}")
+        
+        # Dispatch every search at once; the Yelp client's token bucket paces
+        # requests to the API's allowed rate. Results are deduplicated as
+        # pages stream in.
+        try:
+            await asyncio.gather(*searches)
+        finally:
+            await self.yelp.close()
+        print(f"📦 Yelp cache: {self.yelp.cache_hits} hits, {self.yelp.cache_misses} misses")
         
-        # Remove duplicates and filter
-        unique_companies = {c['website']: c for c in all_companies}.values()
+        # Rank and filter
         filtered_companies = sorted(
-            list(unique_companies),
+            unique_companies.values(),
             key=lambda x: (x.get('reviews', 0), x.get('rating', 0)),
             reverse=True
         )[:limit]
@@ -154,11 +245,11 @@ class BusinessFinder:
         print(f"\n🎯 Found {len(filtered_companies)} potential businesses")
         return filtered_companies
 
-    def save_results(self, companies: List[Dict]):
-        """Save results to files"""
+    def save_results(self, companies: List[Dict], path: str = LEAD_STORE_PATH):
+        """Save results to the lead store and the URL list"""
         # Save full details
-        with open('discovered_companies.json', 'w') as f:
-            json.dump(companies, f, indent=2)
+        with LeadStore(path) as store:
+            store.upsert(companies)
             
         # Save just URLs for scanning
         urls = [c['website'] for c in companies]
@@ -0,0 +1,91 @@
+import json
+import sqlite3
+import threading
+import time
+from typing import Any, Dict, Optional
+
+_DEFAULT_TTL = object()
+
+class DiskCache:
+    """Persistent key/value store on SQLite with a per-entry TTL.
+
+    Values are stored as JSON. Safe to share between threads; every call
+    is a short transaction guarded by a lock. With `max_entries` set, the
+    oldest writes are evicted (after expired ones) once the store is full.
+    """
+
+    def __init__(self, path: str, ttl: Optional[float] = None, max_entries: Optional[int] = None):
+        self.path = path
+        self.ttl = ttl  # default lifetime in seconds, None never expires
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute('PRAGMA journal_mode=WAL')
+        self._conn.execute(
+            'CREATE TABLE IF NOT EXISTS cache ('
+            'key TEXT PRIMARY KEY, value TEXT NOT NULL, expires_at REAL)'
+        )
+        self._conn.commit()
+
+    def get(self, key: str, default: Any = None) -> Any:
+        with self._lock:
+            row = self._conn.execute(
+                'SELECT value, expires_at FROM cache WHERE key = ?', (key,)
+            ).fetchone()
+            if row is None:
+                return default
+            value, expires_at = row
+            if expires_at is not None and expires_at < time.time():
+                self._conn.execute('DELETE FROM cache WHERE key = ?', (key,))
+                self._conn.commit()
+                return default
+        return json.loads(value)
+
+    def set(self, key: str, value: Any, ttl: Optional[float] = _DEFAULT_TTL):
+        """Store `value` under `key`; `ttl=None` stores it without expiry"""
+        if ttl is _DEFAULT_TTL:
+            ttl = self.ttl
+        expires_at = time.time() + ttl if ttl is not None else None
+        with self._lock:
+            self._conn.execute(
+                'INSERT OR REPLACE INTO cache (key, value, expires_at) VALUES (?, ?, ?)',
+                (key, json.dumps(value), expires_at)
+            )
+            if self.max_entries is not None:
+                self._evict()
+            self._conn.commit()
+
+    def set_many(self, items: Dict[str, Any], ttl: Optional[float] = _DEFAULT_TTL):
+        """Store every key/value pair in `items` in a single transaction"""
+        if ttl is _DEFAULT_TTL:
+            ttl = self.ttl
+        expires_at = time.time() + ttl if ttl is not None else None
+        with self._lock:
+            self._conn.executemany(
+                'INSERT OR REPLACE INTO cache (key, value, expires_at) VALUES (?, ?, ?)',
+                [(key, json.dumps(value), expires_at) for key, value in items.items()]
+            )
+            if self.max_entries is not None:
+                self._evict()
+            self._conn.commit()
+
+    def _evict(self):
+        (count,) = self._conn.execute('SELECT COUNT(*) FROM cache').fetchone()
+        if count <= self.max_entries:
+            return
+        self._conn.execute('DELETE FROM cache WHERE expires_at < ?', (time.time(),))
+        # REPLACE re-inserts rows, so rowid order is write order
+        self._conn.execute(
+            'DELETE FROM cache WHERE rowid IN ('
+            'SELECT rowid FROM cache ORDER BY rowid LIMIT MAX(0, (SELECT COUNT(*) FROM cache) - ?))',
+            (self.max_entries,)
+        )
+
+    def delete(self, key: str):
+        with self._lock:
+            self._conn.execute('DELETE FROM cache WHERE key = ?', (key,))
+            self._conn.commit()
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
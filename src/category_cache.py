@@ -0,0 +1,53 @@
+import hashlib
+import json
+import re
+from typing import Iterable, List
+from cache import DiskCache
+from config import CATEGORY_CACHE_PATH, CATEGORY_CACHE_TTL, REFRESH_CATEGORIES, PIN_CATEGORIES
+
+LIST_MARKER = re.compile(r'^\s*(?:[-*•]+|\d+[.)])\s*')
+
+def normalize_categories(text: str) -> List[str]:
+    """One search term per line, without list markers, quotes or duplicates"""
+    categories = []
+    for line in text.strip().split('\n'):
+        term = LIST_MARKER.sub('', line).strip().strip('"\'').strip()
+        term = ' '.join(term.lower().split())
+        if term and term not in categories:
+            categories.append(term)
+    return categories
+
+def category_cache_key(model: str, prompt: str, seeds: Iterable[str] = ()) -> str:
+    payload = json.dumps({'prompt': prompt, 'seeds': sorted(seeds)}, sort_keys=True)
+    return f"categories:{model}:{hashlib.sha256(payload.encode('utf-8')).hexdigest()}"
+
+def generate_categories(openai, prompt: str, model: str = 'gpt-3.5-turbo',
+                        seeds: Iterable[str] = (), refresh: bool = REFRESH_CATEGORIES,
+                        pin: bool = PIN_CATEGORIES) -> List[str]:
+    """Ask the LLM for search categories, memoized on disk.
+
+    Lists are cached by model plus a hash of the prompt and seed set, so
+    repeated runs reuse the same terms (and hit the same Yelp cache keys).
+    `refresh` always calls the model and overwrites the entry; `pin` stores
+    the result without expiry so it stays until explicitly refreshed.
+    """
+    cache = DiskCache(CATEGORY_CACHE_PATH, ttl=CATEGORY_CACHE_TTL)
+    try:
+        key = category_cache_key(model, prompt, seeds)
+        if not refresh:
+            cached = cache.get(key)
+            if cached is not None:
+                print("📦 Using cached search categories")
+                if pin:
+                    cache.set(key, cached, ttl=None)
+                return cached
+
+        response = openai.chat.completions.create(
+            model=model,
+            messages=[{"role": "user", "content": prompt}]
+        )
+        categories = normalize_categories(response.choices[0].message.content)
+        cache.set(key, categories, ttl=None if pin else CATEGORY_CACHE_TTL)
+        return categories
+    finally:
+        cache.close()
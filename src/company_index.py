@@ -0,0 +1,118 @@
+import heapq
+from bisect import bisect_left
+from typing import Dict, Iterator, List, NamedTuple, Optional, Set
+
+SORT_KEYS = ['name', 'type', 'area', 'rating', 'reviews']
+NUMERIC_KEYS = {'rating', 'reviews'}
+MAX_PAGE_SIZE = 500
+
+class CompaniesPage(NamedTuple):
+    companies: List[dict]
+    total: int  # matches across all pages
+
+class CompaniesIndex:
+    """Sorted columns and posting lists over a companies list.
+
+    Each sort key keeps the row ids in order plus each row's rank in that
+    order; area and type keep a posting set per value; rating and reviews
+    are range-filtered by bisecting their sorted column. A query
+    intersects the filters and only ranks the rows that make the page.
+    """
+
+    def __init__(self, companies: List[dict]):
+        self.companies = companies
+        self.order: Dict[str, List[int]] = {}
+        self.rank: Dict[str, List[int]] = {}
+        self.values: Dict[str, List] = {}
+        for key in SORT_KEYS:
+            order = sorted(range(len(companies)), key=lambda i: self._sort_value(key, i))
+            rank = [0] * len(companies)
+            for position, i in enumerate(order):
+                rank[i] = position
+            self.order[key] = order
+            self.rank[key] = rank
+            if key in NUMERIC_KEYS:
+                self.values[key] = [self._sort_value(key, i) for i in order]
+        self.by_area = self._postings('area')
+        self.by_type = self._postings('type')
+        self.columns = list(dict.fromkeys(key for company in companies for key in company))
+
+    def _sort_value(self, key: str, i: int):
+        value = self.companies[i].get(key)
+        if key in NUMERIC_KEYS:
+            return value or 0
+        return (value or '').lower()
+
+    def _postings(self, key: str) -> Dict[str, Set[int]]:
+        postings: Dict[str, Set[int]] = {}
+        for i, company in enumerate(self.companies):
+            postings.setdefault(company.get(key) or '', set()).add(i)
+        return postings
+
+    def _at_least(self, key: str, minimum: float) -> Set[int]:
+        return set(self.order[key][bisect_left(self.values[key], minimum):])
+
+    def _parse_sort(self, sort: str):
+        key = sort.lstrip('-')
+        if key not in SORT_KEYS:
+            raise ValueError(f"Unknown sort key: {key}")
+        return key, sort.startswith('-')
+
+    def _matches(self, area: Optional[str] = None, type: Optional[str] = None,
+                 min_rating: Optional[float] = None,
+                 min_reviews: Optional[int] = None) -> Optional[Set[int]]:
+        """Ids passing every given filter, or None when there are no filters"""
+        filters = []
+        if area is not None:
+            filters.append(self.by_area.get(area, set()))
+        if type is not None:
+            filters.append(self.by_type.get(type, set()))
+        if min_rating is not None:
+            filters.append(self._at_least('rating', min_rating))
+        if min_reviews is not None:
+            filters.append(self._at_least('reviews', min_reviews))
+        if not filters:
+            return None
+        filters.sort(key=len)
+        return filters[0].intersection(*filters[1:])
+
+    def query(self, page: int = 1, page_size: int = 50, sort: str = '-reviews',
+              **filters) -> CompaniesPage:
+        """One page of companies matching every filter (see _matches), ordered
+        by `sort` (a SORT_KEYS name, prefixed with '-' for descending)"""
+        key, descending = self._parse_sort(sort)
+        page = max(page, 1)
+        page_size = min(max(page_size, 1), MAX_PAGE_SIZE)
+        offset = (page - 1) * page_size
+
+        matches = self._matches(**filters)
+        if matches is None:
+            order = self.order[key]
+            total = len(order)
+            if descending:
+                end = max(total - offset, 0)
+                ids = order[max(end - page_size, 0):end][::-1]
+            else:
+                ids = order[offset:offset + page_size]
+        else:
+            total = len(matches)
+            rank = self.rank[key]
+            select = heapq.nlargest if descending else heapq.nsmallest
+            ids = select(offset + page_size, matches, key=rank.__getitem__)[offset:]
+
+        return CompaniesPage([self.companies[i] for i in ids], total)
+
+    def iter_matches(self, sort: Optional[str] = None, **filters) -> Iterator[dict]:
+        """Every company matching the filters, in file order unless `sort` is given"""
+        matches = self._matches(**filters)
+        if sort is None:
+            ids = range(len(self.companies)) if matches is None else sorted(matches)
+        else:
+            key, descending = self._parse_sort(sort)
+            order = reversed(self.order[key]) if descending else self.order[key]
+            ids = order if matches is None else (i for i in order if i in matches)
+        for i in ids:
+            yield self.companies[i]
+
+    def facets(self) -> Dict[str, List[str]]:
+        return {'areas': sorted(self.by_area), 'types': sorted(self.by_type)}
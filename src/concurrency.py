@@ -0,0 +1,132 @@
+import asyncio
+import time
+from typing import List, Tuple
+
+class AdaptiveLimiter:
+    """Concurrency limit tuned at runtime with AIMD.
+
+    Every `interval` seconds the controller looks at the last window:
+    - error rate above `max_error_rate` or event-loop lag above
+      `max_loop_lag` halves the limit (multiplicative decrease)
+    - otherwise, if every slot was busy and throughput did not drop,
+      the limit grows by one (additive increase)
+    - a drop in throughput right after growing steps the limit back by one;
+      other drops leave it unchanged
+
+    Call drained() once no more work will be queued: the limit is then
+    frozen, so the falling throughput of the final windows does not pull
+    it down, and summary() reports the value it had settled at.
+    """
+
+    def __init__(self, initial: int = 5, minimum: int = 1, maximum: int = 64,
+                 interval: float = 2.0, max_error_rate: float = 0.25,
+                 max_loop_lag: float = 0.25, lag_probe: float = 0.05):
+        self.limit = max(minimum, min(initial, maximum))
+        self.minimum = minimum
+        self.maximum = maximum
+        self.interval = interval
+        self.max_error_rate = max_error_rate
+        self.max_loop_lag = max_loop_lag
+        self.lag_probe = lag_probe
+        self.peak = self.limit
+        self.settled = None  # limit when the input ran out, see drained()
+        self.history: List[Tuple[float, int]] = []  # (elapsed seconds, limit)
+
+        self._in_flight = 0
+        self._cond = asyncio.Condition()
+        self._tasks = []
+        self._started = 0.0
+        self._reset_window()
+        self._last_throughput = None
+        self._grew = False
+
+    def _reset_window(self):
+        self._completed = 0
+        self._errors = 0
+        self._saturated = self._in_flight >= self.limit
+        self._max_lag = 0.0
+
+    async def __aenter__(self) -> 'AdaptiveLimiter':
+        self.start()
+        return self
+
+    async def __aexit__(self, *exc_info):
+        await self.stop()
+
+    def start(self):
+        self._started = time.monotonic()
+        self.history.append((0.0, self.limit))
+        self._tasks = [
+            asyncio.create_task(self._control_loop()),
+            asyncio.create_task(self._lag_monitor())
+        ]
+
+    async def stop(self):
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+
+    async def acquire(self):
+        async with self._cond:
+            await self._cond.wait_for(lambda: self._in_flight < self.limit)
+            self._in_flight += 1
+            if self._in_flight >= self.limit:
+                self._saturated = True
+
+    async def release(self, ok: bool = True):
+        async with self._cond:
+            self._in_flight -= 1
+            self._completed += 1
+            if not ok:
+                self._errors += 1
+            self._cond.notify_all()
+
+    def drained(self):
+        """Record that no more work is coming and stop adjusting the limit"""
+        if self.settled is None:
+            self.settled = self.limit
+
+    async def _lag_monitor(self):
+        """Track how late the loop wakes us up; a busy loop means CPU-bound work"""
+        while True:
+            start = time.monotonic()
+            await asyncio.sleep(self.lag_probe)
+            lag = time.monotonic() - start - self.lag_probe
+            self._max_lag = max(self._max_lag, lag)
+
+    async def _control_loop(self):
+        while True:
+            await asyncio.sleep(self.interval)
+            async with self._cond:
+                self._adjust()
+                self._cond.notify_all()
+
+    def _adjust(self):
+        if self.settled is not None:
+            self._reset_window()
+            return
+        completed = self._completed
+        throughput = completed / self.interval
+        error_rate = self._errors / completed if completed else 0.0
+        previous = self.limit
+
+        if error_rate > self.max_error_rate or self._max_lag > self.max_loop_lag:
+            self.limit = max(self.minimum, self.limit // 2)
+        elif self._last_throughput is not None and throughput < self._last_throughput * 0.9:
+            if self._grew:
+                self.limit = max(self.minimum, self.limit - 1)
+        elif self._saturated:
+            self.limit = min(self.maximum, self.limit + 1)
+
+        if self.limit != previous:
+            self.history.append((time.monotonic() - self._started, self.limit))
+        self.peak = max(self.peak, self.limit)
+        self._grew = self.limit > previous
+        self._last_throughput = throughput
+        self._reset_window()
+
+    def summary(self) -> str:
+        limit = self.limit if self.settled is None else self.settled
+        return (f"Concurrency settled at {limit} "
+                f"(peak {self.peak}, {len(self.history) - 1} adjustments)")
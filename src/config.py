@@ -8,6 +8,8 @@ load_dotenv()
 # MongoDB Configuration
 MONGO_URI = os.getenv('MONGO_URI', 'mongodb://localhost:27017')
 DB_NAME = os.getenv('DB_NAME', 'smb_scanner')
+MONGO_BATCH_SIZE = int(os.getenv('MONGO_BATCH_SIZE', 500))  # upserts per bulk_write
+MONGO_FLUSH_INTERVAL = 5.0  # seconds before a partial batch is written
 
 # API Keys and Configurations
 GOOGLE_API_KEY = os.getenv('GOOGLE_API_KEY')
@@ -16,6 +18,78 @@ GOOGLE_API_KEY = os.getenv('GOOGLE_API_KEY')
 MAX_TIMEOUT = 30  # seconds
 USER_AGENT = 'SMBScanner/1.0'
 
+# HTTP connection pool shared by all scanners in a run
+HTTP_POOL_LIMIT = int(os.getenv('HTTP_POOL_LIMIT', 100))  # total open connections
+HTTP_POOL_LIMIT_PER_HOST = int(os.getenv('HTTP_POOL_LIMIT_PER_HOST', 4))
+HTTP_CONNECT_TIMEOUT = 10  # seconds
+HTTP_KEEPALIVE_TIMEOUT = 30  # seconds an idle connection stays in the pool
+HTTP_READ_TIMEOUT = 10  # seconds to wait for each chunk of a response body
+HTTP_MAX_BODY_BYTES = int(os.getenv('HTTP_MAX_BODY_BYTES', 2 * 1024 * 1024))  # larger bodies are truncated
+HTTP_READ_CHUNK = 64 * 1024
+HTTP_CONTENT_TYPES = ['text/html', 'application/xhtml+xml']  # others are not parsed
+DNS_CACHE_TTL = 300  # seconds
+
+# Worker processes for HTML parsing (0 parses on the event loop)
+PARSE_WORKERS = int(os.getenv('PARSE_WORKERS', os.cpu_count() or 1))
+HTML_PARSER = os.getenv('HTML_PARSER', 'html.parser')  # BeautifulSoup backend: 'html.parser' or 'lxml'
+
+# Liveness prefilter: DNS + TCP/TLS connect probe before full scans
+LIVENESS_CONCURRENCY = int(os.getenv('LIVENESS_CONCURRENCY', 200))
+LIVENESS_DNS_WORKERS = 64  # threads resolving hostnames
+LIVENESS_DNS_TIMEOUT = 3  # seconds
+LIVENESS_CONNECT_TIMEOUT = 5  # seconds, TLS handshake included
+
+# Optional per-domain crawl beyond the homepage and contact page
+CRAWL_MAX_PAGES = int(os.getenv('CRAWL_MAX_PAGES', 10))  # per domain, homepage included
+CRAWL_MAX_BYTES = int(os.getenv('CRAWL_MAX_BYTES', 5 * 1024 * 1024))  # per domain
+CRAWL_CONCURRENCY = 2  # simultaneous fetches per domain
+CRAWL_MAX_LINKS = 100  # same-site links kept from each page
+
+# Validators, content hashes and parsed results for conditional re-scans
+PAGE_CACHE_PATH = os.getenv('PAGE_CACHE_PATH', 'page_cache.db')
+PAGE_CACHE_TTL = 90 * 24 * 3600  # seconds
+
+# WHOIS stage: cache keyed by registrable domain, per-registry query rates
+WHOIS_CACHE_PATH = os.getenv('WHOIS_CACHE_PATH', 'whois_cache.db')
+WHOIS_CACHE_TTL = 30 * 24 * 3600  # seconds
+WHOIS_NEGATIVE_TTL = 24 * 3600  # failed lookups are retried after a day
+WHOIS_WORKERS = 8
+WHOIS_QUERIES_PER_SECOND = {'com': 2.0, 'net': 2.0, 'default': 1.0}  # keyed by TLD
+
+# Yelp Fusion API limits
+YELP_QPS = float(os.getenv('YELP_QPS', 5))
+YELP_DAILY_QUOTA = int(os.getenv('YELP_DAILY_QUOTA', 5000))
+YELP_MAX_CONNECTIONS = 10
+
+# Yelp response cache; mode is 'use', 'refresh' (re-query and overwrite),
+# 'only' (never call the API) or 'off'
+YELP_CACHE_PATH = os.getenv('YELP_CACHE_PATH', 'yelp_cache.db')
+YELP_CACHE_TTL = 7 * 24 * 3600  # seconds
+YELP_CACHE_MAX_ENTRIES = 50000
+YELP_CACHE_MODE = os.getenv('YELP_CACHE_MODE', 'use')
+
+# LLM-generated search categories, memoized by model + prompt hash
+CATEGORY_CACHE_PATH = os.getenv('CATEGORY_CACHE_PATH', 'category_cache.db')
+CATEGORY_CACHE_TTL = 30 * 24 * 3600  # seconds; pinned lists never expire
+REFRESH_CATEGORIES = os.getenv('REFRESH_CATEGORIES') == '1'
+PIN_CATEGORIES = os.getenv('PIN_CATEGORIES') == '1'
+
+# Lead store (discovered companies)
+LEAD_STORE_PATH = os.getenv('LEAD_STORE_PATH', 'leads.db')
+
+# Lead scoring: points deducted from 100 per finding
+SCORE_WEIGHTS = {
+    'seo_issue': 10,  # per issue
+    'not_mobile_friendly': 20,
+    'security_issue': 15,  # per issue
+    'poor_performance': 20,
+    'outdated_tech': 15
+}
+SCORE_THRESHOLDS = {
+    'many_seo_issues': 3,  # more than this many is flagged
+    'poor_performance': 50  # performance scores below this are penalized
+}
+
 # Nuclei Configuration
 NUCLEI_TEMPLATES = ['cves', 'vulnerabilities', 'misconfiguration']
 
@@ -1,15 +1,105 @@
-from pymongo import MongoClient
-from config import MONGO_URI, DB_NAME
+import time
+from typing import Dict, Iterator, List
+from pymongo import MongoClient, UpdateOne, ReturnDocument, ASCENDING, DESCENDING
+from pymongo.errors import BulkWriteError, OperationFailure
+from config import MONGO_URI, DB_NAME, MONGO_BATCH_SIZE, MONGO_FLUSH_INTERVAL
+
+class BulkWriter:
+    """Buffers website documents and upserts them by URL in unordered bulk_writes.
+
+    A batch is written once `batch_size` URLs are pending or `flush_interval`
+    seconds have passed since the last write. Repeated URLs within a batch
+    collapse to the latest document.
+    """
+
+    def __init__(self, collection, batch_size: int = MONGO_BATCH_SIZE,
+                 flush_interval: float = MONGO_FLUSH_INTERVAL):
+        self.collection = collection
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.upserted = 0
+        self.modified = 0
+        self._pending: Dict[str, Dict] = {}
+        self._last_flush = time.monotonic()
+
+    def __enter__(self) -> 'BulkWriter':
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def add(self, website_data: dict):
+        self._pending[website_data['url']] = website_data
+        if (len(self._pending) >= self.batch_size or
+                time.monotonic() - self._last_flush >= self.flush_interval):
+            self.flush()
+
+    def flush(self):
+        if self._pending:
+            requests = [
+                UpdateOne({'url': url}, {'$set': data}, upsert=True)
+                for url, data in self._pending.items()
+            ]
+            self._pending = {}
+            try:
+                result = self.collection.bulk_write(requests, ordered=False)
+                self.upserted += result.upserted_count
+                self.modified += result.modified_count
+            except BulkWriteError as e:
+                details = e.details
+                self.upserted += details.get('nUpserted', 0)
+                self.modified += details.get('nModified', 0)
+                print(f"Error writing {len(details.get('writeErrors', []))} websites: "
+                      f"{details['writeErrors'][0]['errmsg'] if details.get('writeErrors') else e}")
+        self._last_flush = time.monotonic()
+
+    def close(self):
+        self.flush()
 
 class Database:
-    def __init__(self):
-        self.client = MongoClient(MONGO_URI)
+    def __init__(self, client: MongoClient = None):
+        self.client = client or MongoClient(MONGO_URI)
         self.db = self.client[DB_NAME]
         self.websites = self.db.websites
+        self._ensure_indexes()
+
+    def _ensure_indexes(self):
+        self.websites.create_index([('scan_date', DESCENDING)])
+        try:
+            self.websites.create_index([('url', ASCENDING)], unique=True)
+        except OperationFailure as e:
+            if e.code != 11000:
+                raise
+            removed = self.remove_duplicates()
+            print(f"Removed {removed} duplicate websites before indexing url")
+            self.websites.create_index([('url', ASCENDING)], unique=True)
+
+    def remove_duplicates(self) -> int:
+        """Keep only the most recent scan of each URL"""
+        duplicates = self.websites.aggregate([
+            {'$sort': {'scan_date': -1}},
+            {'$group': {'_id': '$url', 'ids': {'$push': '$_id'}, 'count': {'$sum': 1}}},
+            {'$match': {'count': {'$gt': 1}}}
+        ], allowDiskUse=True)
+        stale: List = []
+        for group in duplicates:
+            stale.extend(group['ids'][1:])
+        if not stale:
+            return 0
+        return self.websites.delete_many({'_id': {'$in': stale}}).deleted_count
+
+    def bulk_writer(self, **kwargs) -> BulkWriter:
+        return BulkWriter(self.websites, **kwargs)
 
     def save_website(self, website_data: dict) -> str:
-        result = self.websites.insert_one(website_data)
-        return str(result.inserted_id)
+        result = self.websites.find_one_and_update(
+            {'url': website_data['url']},
+            {'$set': website_data},
+            upsert=True,
+            projection={'_id': 1},
+            return_document=ReturnDocument.AFTER
+        )
+        return str(result['_id'])
 
     def get_website(self, url: str) -> dict:
         return self.websites.find_one({'url': url})
@@ -22,4 +112,32 @@ class Database:
         return result.modified_count > 0
 
     def get_all_websites(self):
-        return list(self.websites.find()) 
\ No newline at end of file
+        return list(self.websites.find())
+
+    def count_websites(self) -> int:
+        return self.websites.estimated_document_count()
+
+    def iter_websites(self, projection: dict = None, sort: list = None,
+                      batch_size: int = 500) -> Iterator[dict]:
+        """Stream websites through a batched cursor, fetching only `projection`"""
+        cursor = self.websites.find({}, projection, batch_size=batch_size)
+        if sort:
+            cursor = cursor.sort(sort)
+        with cursor:
+            yield from cursor
+
+    def iter_summaries(self, batch_size: int = 500) -> Iterator[dict]:
+        """URL, score, issue count and scan date per website, newest scans first,
+        computed on the server so the scan_results blobs never leave it"""
+        pipeline = [
+            {'$sort': {'scan_date': -1}},
+            {'$project': {
+                '_id': 0,
+                'url': 1,
+                'scan_date': 1,
+                'score': {'$ifNull': ['$scan_results.score', 0]},
+                'issues': {'$size': {'$ifNull': ['$scan_results.issues', []]}}
+            }}
+        ]
+        with self.websites.aggregate(pipeline, batchSize=batch_size, allowDiskUse=True) as cursor:
+            yield from cursor
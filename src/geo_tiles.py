@@ -0,0 +1,63 @@
+import math
+from typing import List, NamedTuple
+
+METERS_PER_DEGREE = 111320
+
+def distance(a, b) -> float:
+    """Meters between two (lat, lng) points (equirectangular approximation)"""
+    lat = math.radians((a[0] + b[0]) / 2)
+    return math.hypot((a[0] - b[0]) * METERS_PER_DEGREE,
+                      (a[1] - b[1]) * METERS_PER_DEGREE * math.cos(lat))
+
+class Circle(NamedTuple):
+    """Area a Yelp query actually searched: `radius` meters around `center`"""
+    center: tuple
+    radius: float
+
+    def covers(self, tile: 'Tile') -> bool:
+        return all(distance(self.center, corner) <= self.radius for corner in tile.corners)
+
+class Tile(NamedTuple):
+    """Lat/long bounding box searched as the smallest circle covering it"""
+    south: float
+    west: float
+    north: float
+    east: float
+
+    @property
+    def center(self):
+        return (self.south + self.north) / 2, (self.west + self.east) / 2
+
+    @property
+    def radius(self) -> int:
+        """Half the diagonal in meters (equirectangular approximation)"""
+        lat, _ = self.center
+        height = (self.north - self.south) * METERS_PER_DEGREE
+        width = (self.east - self.west) * METERS_PER_DEGREE * math.cos(math.radians(lat))
+        return int(math.ceil(math.hypot(height, width) / 2))
+
+    @property
+    def corners(self):
+        return [(self.south, self.west), (self.south, self.east),
+                (self.north, self.west), (self.north, self.east)]
+
+    def split(self) -> List['Tile']:
+        """Quarter the tile"""
+        lat, lng = self.center
+        return [
+            Tile(self.south, self.west, lat, lng),
+            Tile(self.south, lng, lat, self.east),
+            Tile(lat, self.west, self.north, lng),
+            Tile(lat, lng, self.north, self.east)
+        ]
+
+def tiles_within_radius(region: Tile, max_radius: int) -> List[Tile]:
+    """Split `region` until every tile's covering circle fits in `max_radius`"""
+    tiles, pending = [], [region]
+    while pending:
+        tile = pending.pop()
+        if tile.radius > max_radius:
+            pending.extend(tile.split())
+        else:
+            tiles.append(tile)
+    return tiles
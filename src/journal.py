@@ -0,0 +1,87 @@
+import json
+import os
+from typing import Dict, Iterator, Set
+
+def is_final(result: Dict) -> bool:
+    """Whether a recorded result settles its URL; hosts the liveness
+    prefilter found unreachable are scanned again on resume"""
+    return not str(result.get('error') or '').startswith('unreachable')
+
+class ScanJournal:
+    """Append-only JSONL checkpoint of finished scans, one result per line.
+
+    Each result is flushed as soon as it is recorded (and fsynced every
+    `fsync_every` records), so an interrupted run loses at most the scans
+    that were in flight. A torn final line from a crash is skipped when reading.
+    """
+
+    def __init__(self, path: str = 'scan_journal.jsonl', fsync_every: int = 50):
+        self.path = path
+        self.fsync_every = fsync_every
+        self._file = None
+        self._unsynced = 0
+
+    def __enter__(self) -> 'ScanJournal':
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def iter_results(self) -> Iterator[Dict]:
+        """Recorded results in the order they finished, read lazily"""
+        if not os.path.exists(self.path):
+            return
+        with open(self.path, 'r', encoding='utf-8') as f:
+            for line in f:
+                try:
+                    yield json.loads(line)
+                except json.JSONDecodeError:
+                    continue  # torn write from an interrupted run
+
+    def completed_urls(self) -> Set[str]:
+        return {result['url'] for result in self.iter_results() if is_final(result)}
+
+    def open(self, resume: bool = False):
+        """Start a fresh journal, or append to the existing one when resuming"""
+        if resume and os.path.exists(self.path):
+            self._truncate_torn_tail()
+            self._file = open(self.path, 'a', encoding='utf-8')
+        else:
+            self._file = open(self.path, 'w', encoding='utf-8')
+
+    def _truncate_torn_tail(self):
+        """Cut a partial last line so new records start on a line of their own"""
+        with open(self.path, 'rb+') as f:
+            f.seek(0, os.SEEK_END)
+            size = f.tell()
+            if size == 0:
+                return
+            f.seek(size - 1)
+            if f.read(1) == b'\n':
+                return
+            end = size
+            while end > 0:
+                start = max(0, end - 4096)
+                f.seek(start)
+                chunk = f.read(end - start)
+                newline = chunk.rfind(b'\n')
+                if newline != -1:
+                    f.truncate(start + newline + 1)
+                    return
+                end = start
+            f.truncate(0)
+
+    def record(self, result: Dict):
+        self._file.write(json.dumps(result, default=str) + '\n')
+        self._file.flush()
+        self._unsynced += 1
+        if self._unsynced >= self.fsync_every:
+            os.fsync(self._file.fileno())
+            self._unsynced = 0
+
+    def close(self):
+        if self._file is not None:
+            self._file.flush()
+            os.fsync(self._file.fileno())
+            self._file.close()
+            self._file = None
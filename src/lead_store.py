@@ -0,0 +1,173 @@
+import argparse
+import json
+import sqlite3
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+from config import LEAD_STORE_PATH
+
+# Typed columns, in the order companies are written out
+LEAD_COLUMNS = [
+    ('name', 'TEXT'),
+    ('website', 'TEXT NOT NULL PRIMARY KEY'),
+    ('address', 'TEXT'),
+    ('phone', 'TEXT'),
+    ('type', 'TEXT'),
+    ('area', 'TEXT'),
+    ('rating', 'REAL'),
+    ('reviews', 'INTEGER'),
+    ('price', 'TEXT'),
+    ('source', 'TEXT')
+]
+COLUMN_NAMES = [name for name, _ in LEAD_COLUMNS]
+INDEXED_COLUMNS = ['type', 'area', 'rating', 'reviews']
+
+class LeadStore:
+    """Discovered companies in a SQLite table with one typed column per field.
+
+    Writes upsert on website, so re-running discovery appends new leads and
+    refreshes known ones. Reads select only the requested columns and are
+    streamed from the cursor. Fields outside LEAD_COLUMNS round-trip through
+    a JSON `extra` column. The database stays in rollback-journal mode so
+    every commit touches the main file (the dashboard reloads on its mtime).
+    """
+
+    def __init__(self, path: str = LEAD_STORE_PATH):
+        self.path = path
+        self.conn = sqlite3.connect(path)
+        columns = ', '.join(f"{name} {sql_type}" for name, sql_type in LEAD_COLUMNS)
+        self.conn.execute(f"CREATE TABLE IF NOT EXISTS leads ({columns}, extra TEXT)")
+        for column in INDEXED_COLUMNS:
+            self.conn.execute(f"CREATE INDEX IF NOT EXISTS leads_{column} ON leads ({column})")
+        self.conn.commit()
+
+    def __enter__(self) -> 'LeadStore':
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def _row(self, company: Dict) -> Tuple:
+        extra = {k: v for k, v in company.items() if k not in COLUMN_NAMES}
+        return tuple(company.get(name) for name in COLUMN_NAMES) + (json.dumps(extra) if extra else None,)
+
+    def upsert(self, companies: Iterable[Dict], batch_size: int = 1000) -> int:
+        """Insert companies, replacing any stored under the same website"""
+        placeholders = ', '.join('?' * (len(COLUMN_NAMES) + 1))
+        updates = ', '.join(f"{name} = excluded.{name}" for name in COLUMN_NAMES + ['extra']
+                            if name != 'website')
+        sql = (f"INSERT INTO leads ({', '.join(COLUMN_NAMES)}, extra) VALUES ({placeholders}) "
+               f"ON CONFLICT(website) DO UPDATE SET {updates}")
+        count, batch = 0, []
+        with self.conn:
+            for company in companies:
+                batch.append(self._row(company))
+                if len(batch) >= batch_size:
+                    self.conn.executemany(sql, batch)
+                    count += len(batch)
+                    batch = []
+            if batch:
+                self.conn.executemany(sql, batch)
+                count += len(batch)
+        return count
+
+    def _where(self, area: Optional[str] = None, type: Optional[str] = None,
+               min_rating: Optional[float] = None,
+               min_reviews: Optional[int] = None) -> Tuple[str, List]:
+        clauses, params = [], []
+        for clause, value in [('area = ?', area), ('type = ?', type),
+                              ('rating >= ?', min_rating), ('reviews >= ?', min_reviews)]:
+            if value is not None:
+                clauses.append(clause)
+                params.append(value)
+        return (f" WHERE {' AND '.join(clauses)}" if clauses else ''), params
+
+    def _columns(self, columns: Optional[List[str]]) -> List[str]:
+        columns = columns or COLUMN_NAMES
+        unknown = [c for c in columns if c not in COLUMN_NAMES]
+        if unknown:
+            raise ValueError(f"Unknown columns: {', '.join(unknown)}")
+        return columns
+
+    def iter_companies(self, columns: Optional[List[str]] = None, order_by: Optional[str] = None,
+                       limit: Optional[int] = None, batch_size: int = 1000, **filters) -> Iterator[Dict]:
+        """Stream companies as dicts with only `columns`, dropping empty fields.
+
+        `order_by` is a column name, prefixed with '-' for descending; the
+        filters are area, type, min_rating and min_reviews.
+        """
+        select = self._columns(columns)
+        with_extra = columns is None
+        where, params = self._where(**filters)
+        sql = f"SELECT {', '.join(select + (['extra'] if with_extra else []))} FROM leads{where}"
+        if order_by:
+            sql += f" ORDER BY {self._columns([order_by.lstrip('-')])[0]}"
+            sql += " DESC" if order_by.startswith('-') else ""
+        if limit is not None:
+            sql += " LIMIT ?"
+            params.append(limit)
+        cursor = self.conn.execute(sql, params)
+        while True:
+            rows = cursor.fetchmany(batch_size)
+            if not rows:
+                break
+            for row in rows:
+                company = {name: value for name, value in zip(select, row) if value is not None}
+                if with_extra and row[-1]:
+                    company.update(json.loads(row[-1]))
+                yield company
+
+    def count(self, **filters) -> int:
+        where, params = self._where(**filters)
+        return self.conn.execute(f"SELECT COUNT(*) FROM leads{where}", params).fetchone()[0]
+
+    def distinct(self, column: str) -> List:
+        column = self._columns([column])[0]
+        return [row[0] for row in self.conn.execute(
+            f"SELECT DISTINCT {column} FROM leads WHERE {column} IS NOT NULL ORDER BY rowid")]
+
+    def group_counts(self, column: str) -> List[Tuple]:
+        """(value, count) pairs, largest groups first"""
+        column = self._columns([column])[0]
+        return self.conn.execute(
+            f"SELECT {column}, COUNT(*) AS n FROM leads GROUP BY {column} ORDER BY n DESC").fetchall()
+
+    def import_json(self, path: str) -> int:
+        with open(path, 'r') as f:
+            return self.upsert(json.load(f))
+
+    def export_json(self, path: str) -> int:
+        """Write every lead as a JSON list, one company at a time"""
+        count = 0
+        with open(path, 'w') as f:
+            f.write('[')
+            for company in self.iter_companies():
+                f.write(',\n' if count else '\n')
+                f.write(json.dumps(company))
+                count += 1
+            f.write('\n]\n')
+        return count
+
+    def close(self):
+        self.conn.close()
+
+def main():
+    parser = argparse.ArgumentParser(description="Manage the lead store")
+    parser.add_argument('--db', default=LEAD_STORE_PATH, help="lead store database")
+    commands = parser.add_subparsers(dest='command', required=True)
+    commands.add_parser('import', help="upsert companies from a JSON list").add_argument('path')
+    commands.add_parser('export', help="write all companies to a JSON list").add_argument('path')
+    commands.add_parser('stats', help="count leads by area and type")
+    args = parser.parse_args()
+
+    with LeadStore(args.db) as store:
+        if args.command == 'import':
+            print(f"📥 Imported {store.import_json(args.path)} companies into {args.db}")
+        elif args.command == 'export':
+            print(f"📤 Exported {store.export_json(args.path)} companies to {args.path}")
+        else:
+            print(f"📊 {store.count()} leads")
+            for column in ('area', 'type'):
+                for value, count in store.group_counts(column):
+                    print(f"  {column} {value}: {count}")
+
+if __name__ == "__main__":
+    main()
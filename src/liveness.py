@@ -0,0 +1,131 @@
+import asyncio
+import socket
+import ssl
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Optional, Tuple
+from urllib.parse import urlsplit
+from config import (
+    LIVENESS_CONCURRENCY, LIVENESS_DNS_WORKERS, LIVENESS_DNS_TIMEOUT,
+    LIVENESS_CONNECT_TIMEOUT, MAX_TIMEOUT
+)
+
+class LivenessProbe:
+    """Cheap reachability check run before full scans.
+
+    Each distinct scheme/host/port is resolved (on a dedicated thread pool,
+    so lookups run in bulk rather than through the loop's small default
+    executor) and then probed with a TCP connect, plus a TLS handshake for
+    https. Short timeouts keep dead hosts from holding scanner slots for
+    the full request timeout. Every resolved address is tried in turn, as
+    aiohttp would. URLs with no usable host (bad port, overlong label) are
+    reported as 'invalid'. Parked domains still answer and pass.
+    """
+
+    def __init__(self, concurrency: int = LIVENESS_CONCURRENCY,
+                 dns_workers: int = LIVENESS_DNS_WORKERS,
+                 dns_timeout: float = LIVENESS_DNS_TIMEOUT,
+                 connect_timeout: float = LIVENESS_CONNECT_TIMEOUT):
+        self.concurrency = concurrency
+        self.dns_workers = dns_workers
+        self.dns_timeout = dns_timeout
+        self.connect_timeout = connect_timeout
+        self.elapsed = 0.0
+        self._ssl = ssl.create_default_context()
+
+    def _target(self, url: str) -> Optional[Tuple[str, str, int]]:
+        """(scheme, host, port) to probe, or None if the URL has no usable host"""
+        try:
+            parts = urlsplit(url)
+            port = parts.port
+        except ValueError:
+            return None
+        scheme = parts.scheme.lower() or 'http'
+        if not parts.hostname:
+            return None
+        return scheme, parts.hostname.lower(), port or (443 if scheme == 'https' else 80)
+
+    async def _connect(self, addresses: List, target: Tuple[str, str, int]):
+        """Open a connection (and TLS session for https) to the first address
+        that accepts one; raises the last address's error if none does"""
+        scheme, host, port = target
+        error = None
+        for sockaddr in dict.fromkeys(address[4][0] for address in addresses):
+            try:
+                _, writer = await asyncio.wait_for(
+                    asyncio.open_connection(
+                        sockaddr, port,
+                        ssl=self._ssl if scheme == 'https' else None,
+                        server_hostname=host if scheme == 'https' else None
+                    ),
+                    self.connect_timeout
+                )
+            except (asyncio.TimeoutError, OSError) as e:
+                error = e
+                continue
+            writer.close()
+            return
+        raise error or OSError(f"no addresses for {host}")
+
+    async def _probe(self, target: Tuple[str, str, int], dns: ThreadPoolExecutor,
+                     semaphore: asyncio.Semaphore) -> Dict:
+        """{'alive', 'reason', 'elapsed'} for one target; reason is None when alive"""
+        _, host, port = target
+        loop = asyncio.get_running_loop()
+        async with semaphore:
+            start = time.monotonic()
+            result = {'alive': False, 'reason': None}
+            try:
+                addresses = await asyncio.wait_for(
+                    loop.run_in_executor(dns, socket.getaddrinfo, host, port, 0, socket.SOCK_STREAM),
+                    self.dns_timeout
+                )
+                await self._connect(addresses, target)
+                result['alive'] = True
+            except socket.gaierror:
+                result['reason'] = 'dns'
+            except asyncio.TimeoutError:
+                result['reason'] = 'timeout'
+            except ssl.SSLError:
+                result['reason'] = 'tls'
+            except (ConnectionError, OSError):
+                result['reason'] = 'connect'
+            except ValueError:  # UnicodeError from IDNA encoding an invalid host
+                result['reason'] = 'invalid'
+            result['elapsed'] = time.monotonic() - start
+            return result
+
+    async def check(self, urls: List[str]) -> Dict[str, Dict]:
+        """Probe results keyed by URL (URLs sharing a host share one probe)"""
+        start = time.monotonic()
+        targets = {url: self._target(url) for url in urls}
+        unique = list(dict.fromkeys(t for t in targets.values() if t is not None))
+        semaphore = asyncio.Semaphore(self.concurrency)
+        dns = ThreadPoolExecutor(max_workers=self.dns_workers, thread_name_prefix='dns')
+        try:
+            probes = await asyncio.gather(*(self._probe(t, dns, semaphore) for t in unique))
+        finally:
+            dns.shutdown(wait=False)  # abandoned lookups finish in the background
+        self.elapsed = time.monotonic() - start
+        by_target = dict(zip(unique, probes))
+        by_target[None] = {'alive': False, 'reason': 'invalid', 'elapsed': 0.0}
+        return {url: by_target[target] for url, target in targets.items()}
+
+def summarize(results: Dict[str, Dict], elapsed: float) -> str:
+    """How many URLs were dropped, why, and the scan time that saves.
+
+    A URL whose host timed out would have held a scanner slot for up to
+    MAX_TIMEOUT; other failures would have cost a full scan about what they
+    cost here. The slot time spent probing every host, live ones included,
+    is subtracted to give the net figure.
+    """
+    dead = [r for r in results.values() if not r['alive']]
+    reasons = {}
+    for r in dead:
+        reasons[r['reason']] = reasons.get(r['reason'], 0) + 1
+    avoided = sum(MAX_TIMEOUT if r['reason'] == 'timeout' else r['elapsed'] for r in dead)
+    probing = sum(r['elapsed'] for r in {id(r): r for r in results.values()}.values())
+    detail = ', '.join(f"{count} {reason}" for reason, count in sorted(reasons.items()))
+    return (f"Liveness: {len(dead)} of {len(results)} URLs unreachable"
+            f"{f' ({detail})' if detail else ''} in {elapsed:.1f}s; "
+            f"~{round(avoided - probing)} scanner slot-seconds saved net of {probing:.0f} spent probing")
@@ -1,14 +1,27 @@
+import argparse
 import asyncio
 import aiohttp
-from typing import List, Dict
-import pandas as pd
+from concurrent.futures import Executor, ProcessPoolExecutor
+from typing import AsyncIterator, Iterable, List, Dict
 from tqdm import tqdm
-from scanners.contact_scanner import ContactScanner
+from scanners.site_scanner import SiteScanner
+from scanners.http_client import HTTPClient, PageCache
+from scanners.whois_stage import WhoisStage
+from concurrency import AdaptiveLimiter
+from config import PARSE_WORKERS
+from journal import ScanJournal, is_final
+from sinks import ResultSink, CSVSink, open_sink
+from liveness import LivenessProbe, summarize
+from scanners.contact_scanner import empty_contacts
 import os
+from urllib.parse import urlsplit
 
-async def scan_website(url: str) -> Dict:
-    """Scan a single website"""
-    scanner = ContactScanner(url)
+async def scan_website(url: str, session: aiohttp.ClientSession = None, executor: Executor = None,
+                       google_checks: bool = False, whois_stage: WhoisStage = None,
+                       page_cache: PageCache = None, crawl: bool = False, whois: bool = True) -> Dict:
+    """Scan a single website for contacts and SEO in one fetch"""
+    scanner = SiteScanner(url, session=session, executor=executor, google_checks=google_checks,
+                          whois_stage=whois_stage, page_cache=page_cache, crawl=crawl, whois=whois)
     try:
         results = await scanner.scan()
         results['url'] = url
@@ -17,43 +30,121 @@ async def scan_website(url: str) -> Dict:
         print(f"Error scanning {url}: {str(e)}")
         return {'url': url, 'error': str(e)}
 
-async def scan_websites(urls: List[str], max_concurrent: int = 5):
-    """Scan multiple websites concurrently"""
-    semaphore = asyncio.Semaphore(max_concurrent)
-    
-    async def bounded_scan(url):
-        async with semaphore:
-            return await scan_website(url)
-    
-    tasks = [bounded_scan(url) for url in urls]
-    results = []
+async def iter_scans(urls: List[str], max_concurrent: int = 64, initial_concurrent: int = 5,
+                     client: HTTPClient = None, parse_workers: int = PARSE_WORKERS,
+                     google_checks: bool = False, crawl: bool = False) -> AsyncIterator[Dict]:
+    """Scan multiple websites concurrently, yielding each result as it completes.
+
+    Concurrency starts at `initial_concurrent` and is tuned between 1 and
+    `max_concurrent` by an AdaptiveLimiter based on throughput, error rate
+    and event-loop lag; URLs are only scheduled when a slot frees up, so
+    memory does not grow with the URL list. HTML parsing runs in a pool of
+    `parse_workers` processes so downloads keep flowing while pages are
+    parsed. WHOIS goes through a shared, disk-cached WhoisStage after the
+    site's scan slot is released, so registry throttling never holds a
+    slot. Pages
+    are fetched with conditional GETs against a PageCache, so sites
+    unchanged since the last scan reuse their previous extraction. With
+    `crawl`, each site gets a budgeted crawl (see scanners.crawler) instead
+    of only its homepage and contact page.
+    """
+    limiter = AdaptiveLimiter(initial=initial_concurrent, maximum=max_concurrent)
+    client = client or HTTPClient()
+    executor = ProcessPoolExecutor(max_workers=parse_workers) if parse_workers > 0 else None
+    page_cache = PageCache()
     
-    for task in tqdm(asyncio.as_completed(tasks), total=len(tasks), desc="Scanning websites"):
-        result = await task
-        results.append(result)
+    try:
+        async with client, limiter, WhoisStage() as whois_stage:
+            completed = asyncio.Queue()
+            running = set()
+            
+            async def run(url):
+                result = {'url': url}
+                try:
+                    try:
+                        result = await scan_website(url, client.session, executor, google_checks,
+                                                    whois_stage, page_cache, crawl, whois=False)
+                    finally:
+                        await limiter.release(ok='error' not in result)
+                    # None marks a scanned site whose WHOIS lookup was left to us
+                    if 'whois_info' in result and result['whois_info'] is None:
+                        result['whois_info'] = await whois_stage.lookup(urlsplit(url).hostname or url)
+                finally:
+                    completed.put_nowait(result)
+            
+            async def schedule():
+                for url in urls:
+                    await limiter.acquire()
+                    task = asyncio.create_task(run(url))
+                    running.add(task)
+                    task.add_done_callback(running.discard)
+                limiter.drained()
+            
+            scheduler = asyncio.create_task(schedule())
+            try:
+                for _ in tqdm(range(len(urls)), desc="Scanning websites"):
+                    yield await completed.get()
+            finally:
+                scheduler.cancel()
+                for task in list(running):
+                    task.cancel()
+                await asyncio.gather(scheduler, *running, return_exceptions=True)
+            
+            print(f"WHOIS cache: {whois_stage.hits} hits, {whois_stage.misses} lookups")
+            print(page_cache.summary())
+    finally:
+        if executor is not None:
+            executor.shutdown()
+        page_cache.close()
     
-    return results
+    print(limiter.summary())
+
+async def scan_websites(urls: List[str], **kwargs) -> List[Dict]:
+    """Scan multiple websites concurrently and collect every result (see iter_scans)"""
+    return [result async for result in iter_scans(urls, **kwargs)]
+
+async def stream_scans(urls: List[str], sink: ResultSink, journal: ScanJournal = None, **kwargs):
+    """Write each result to `journal` and `sink` as soon as it completes"""
+    flusher = asyncio.create_task(sink.flush_periodically())
+    try:
+        async for result in iter_scans(urls, **kwargs):
+            if journal is not None:
+                journal.record(result)
+            await sink.write_async(result)
+    finally:
+        flusher.cancel()
+        await asyncio.gather(flusher, return_exceptions=True)
 
-def export_results(results: List[Dict], filename: str = "scan_results.csv"):
+def unreachable_result(url: str, probe: Dict) -> Dict:
+    """Result recorded for a URL the liveness prefilter dropped.
+
+    Unreachable hosts are retried on resume (see journal.is_final); invalid
+    URLs are not, since they will never scan.
+    """
+    result = empty_contacts()
+    result['url'] = url
+    if probe['reason'] == 'invalid':
+        result['error'] = "invalid URL"
+    else:
+        result['error'] = f"unreachable ({probe['reason']})"
+    result['seo'] = {'issues': [f"Failed to scan: {result['error']}"],
+                     'score': 0, 'google_data': {}}
+    return result
+
+def prefilter(urls: List[str]):
+    """Split `urls` into reachable ones and results for the dead ones"""
+    probe = LivenessProbe()
+    probes = asyncio.run(probe.check(urls))
+    print(summarize(probes, probe.elapsed))
+    alive = [url for url in urls if probes[url]['alive']]
+    dead = [unreachable_result(url, probes[url]) for url in urls if not probes[url]['alive']]
+    return alive, dead
+
+def export_results(results: Iterable[Dict], filename: str = "scan_results.csv"):
     """Export results to CSV"""
-    # Flatten the results
-    flattened = []
-    for r in results:
-        flat = {
-            'url': r.get('url', ''),
-            'emails': ', '.join(r.get('emails', [])),
-            'phones': ', '.join(r.get('phones', [])),
-            'contact_page': r.get('contact_page', ''),
-            'business_hours': r.get('business_hours', ''),
-            'social_media': ', '.join([f"{s['platform']}: {s['url']}" for s in r.get('social_media', [])]),
-            'forms_count': len(r.get('forms', [])),
-            'whois_registrar': r.get('whois_info', {}).get('registrar', ''),
-            'whois_emails': ', '.join(r.get('whois_info', {}).get('emails', []) or [])
-        }
-        flattened.append(flat)
-    
-    df = pd.DataFrame(flattened)
-    df.to_csv(filename, index=False)
+    with CSVSink(filename) as sink:
+        for r in results:
+            sink.write(r)
     print(f"Results exported to {filename}")
 
 def format_url(url: str) -> str:
@@ -63,15 +154,50 @@ def format_url(url: str) -> str:
     return url
 
 def main():
+    parser = argparse.ArgumentParser(description="Scan websites for contacts and SEO issues")
+    parser.add_argument('--input', default='all_urls.txt', help="file with one URL per line")
+    parser.add_argument('--output', default='scan_results.csv',
+                        help="results file (.csv or .jsonl), or 'mongodb' to write to the database")
+    parser.add_argument('--flush-interval', type=float, default=5.0,
+                        help="seconds between output flushes")
+    parser.add_argument('--journal', default='scan_journal.jsonl', help="checkpoint journal of finished scans")
+    parser.add_argument('--resume', action='store_true', help="skip URLs already recorded in the journal")
+    parser.add_argument('--crawl', action='store_true',
+                        help="crawl up to CRAWL_MAX_PAGES pages per site, contact and about pages first")
+    parser.add_argument('--no-prefilter', action='store_true',
+                        help="scan every URL without first probing DNS and TCP/TLS reachability")
+    args = parser.parse_args()
+    
     # Read URLs from file
-    with open('all_urls.txt', 'r') as f:
+    with open(args.input, 'r') as f:
         urls = [format_url(line.strip()) for line in f if line.strip()]
     
-    # Run the scanner
-    results = asyncio.run(scan_websites(urls))
+    journal = ScanJournal(args.journal)
+    completed = journal.completed_urls() if args.resume else set()
+    pending = [url for url in urls if url not in completed]
+    if completed:
+        print(f"Resuming: {len(urls) - len(pending)} of {len(urls)} URLs already scanned")
+    
+    # Drop hosts that don't resolve or accept connections
+    dead = []
+    if pending and not args.no_prefilter:
+        pending, dead = prefilter(pending)
     
-    # Export results
-    export_results(results)
+    # Run the scanner, streaming results out as they finish
+    sink = open_sink(args.output, flush_interval=args.flush_interval)
+    journal.open(resume=args.resume)
+    try:
+        for result in journal.iter_results() if args.resume else []:
+            if is_final(result):
+                sink.write(result)
+        for result in dead:
+            journal.record(result)
+            sink.write(result)
+        asyncio.run(stream_scans(pending, sink, journal, crawl=args.crawl))
+    finally:
+        journal.close()
+        sink.close()
+    print(f"{sink.written} results written to {args.output}")
 
 if __name__ == "__main__":
-    main() 
\ No newline at end of file
+    main()
@@ -1,12 +1,13 @@
 import os
-from typing import List, Dict
-import json
+from typing import AsyncIterator, List, Dict, Optional, Set
 import asyncio
 import aiohttp
 from bs4 import BeautifulSoup
 from dotenv import load_dotenv
-from src.config import get_openai_client
-import requests
+from src.config import get_openai_client, REFRESH_CATEGORIES, PIN_CATEGORIES, LEAD_STORE_PATH
+from src.category_cache import generate_categories
+from src.yelp_client import YelpClient
+from src.lead_store import LeadStore
 from urllib.parse import urlparse
 
 load_dotenv()
@@ -15,6 +16,7 @@ class CompanyFinder:
     def __init__(self):
         self.openai = get_openai_client()
         self.yelp_api_key = os.getenv('YELP_API_KEY')
+        self.yelp = YelpClient(self.yelp_api_key)
         self.target_areas = [
             {'city': 'Los Angeles', 'state': 'CA'},
             {'city': 'San Diego', 'state': 'CA'},
@@ -23,8 +25,9 @@ class CompanyFinder:
             {'city': 'Laguna Beach', 'state': 'CA'}
         ]
         
-    def get_business_categories(self, seed_companies: List[Dict]) -> List[str]:
-        """Use GPT to analyze and categorize seed companies"""
+    def get_business_categories(self, seed_companies: List[Dict], refresh: bool = REFRESH_CATEGORIES,
+                                pin: bool = PIN_CATEGORIES) -> List[str]:
+        """Use GPT to analyze and categorize seed companies (cached, see category_cache)"""
         companies_text = "\n".join([f"{c['name']} - {c.get('type', 'Unknown')}" for c in seed_companies])
         
         prompt = f"""Given these companies:
@@ -45,38 +48,29 @@ class CompanyFinder:
         - Well-established brands
         - Large corporations"""
         
-        response = self.openai.chat.completions.create(
-            model="gpt-3.5-turbo",
-            messages=[{"role": "user", "content": prompt}]
-        )
-        
-        categories = response.choices[0].message.content.strip().split('\n')
-        return categories
+        seeds = [f"{c['name']} - {c.get('type', 'Unknown')}" for c in seed_companies]
+        return generate_categories(self.openai, prompt, model="gpt-3.5-turbo", seeds=seeds,
+                                   refresh=refresh, pin=pin)
+
+    async def iter_yelp(self, category: str, location: Dict, seen: Optional[Set[str]] = None) -> AsyncIterator[Dict]:
+        """Stream businesses with websites from Yelp page by page.
 
-    async def search_yelp(self, category: str, location: Dict) -> List[Dict]:
-        """Search Yelp API for businesses"""
-        companies = []
+        `seen` holds websites already found in this run and is updated as
+        companies are yielded. Paging stops once a page adds nothing new.
+        """
+        seen = set() if seen is None else seen
+        # Search Yelp Business API
+        params = {
+            'categories': category,
+            'location': f"{location['city']}, {location['state']}",
+            'sort_by': 'rating',
+            'attributes': 'website'  # Only businesses with websites
+        }
         
-        try:
-            headers = {
-                'Authorization': f'Bearer {self.yelp_api_key}'
-            }
-            
-            # Search Yelp Business API
-            url = 'https://api.yelp.com/v3/businesses/search'
-            params = {
-                'categories': category,
-                'location': f"{location['city']}, {location['state']}",
-                'limit': 20,
-                'sort_by': 'rating',
-                'attributes': 'website'  # Only businesses with websites
-            }
-            
-            response = requests.get(url, headers=headers, params=params)
-            data = response.json()
-            
+        async for data in self.yelp.iter_pages(params):
+            new_companies = 0
             for business in data.get('businesses', []):
-                if business.get('url'):  # Only if they have a website
+                if business.get('url') and business['url'] not in seen:  # Only if they have a website
                     company = {
                         'name': business['name'],
                         'website': business['url'],
@@ -88,38 +82,51 @@ class CompanyFinder:
                         'reviews': business.get('review_count', 0),
                         'source': 'yelp'
                     }
-                    companies.append(company)
+                    seen.add(company['website'])
+                    new_companies += 1
                     print(f"  ✅ Found: {company['name']}")
-            
-        except Exception as e:
-            print(f"  ❌ Error searching {category} in {location['city']}: {str(e)}")
-            
-        return companies
+                    yield company
+            if new_companies == 0:
+                break
 
     async def find_similar_companies(self, seed_companies: List[Dict], limit: int = 100) -> List[Dict]:
         """Find similar companies using Yelp"""
-        all_companies = []
+        unique_companies = {}
+        seen = set()
         categories = self.get_business_categories(seed_companies)
         
         print("🔍 Generated business categories:")
         for cat in categories:
             print(f"  • {cat}")
         
-        for location in self.target_areas:
-            print(f"\n📍 Searching in {location['city']}...")
-            for category in categories:
-                companies = await self.search_yelp(category, location)
-                all_companies.extend(companies)
-                await asyncio.sleep(1)  # Rate limiting
+        async def collect(category: str, location: Dict):
+            try:
+                async for company in self.iter_yelp(category, location, seen):
+                    if len(unique_companies) >= limit:
+                        break  # enough leads; stop paging this search
+                    unique_companies[company['website']] = company
+            except Exception as e:
+                print(f"  ❌ Error searching {category} in {location['city']}: {str(e)}")
+        
+        # Dispatch the whole area x category grid at once; the Yelp client's
+        # token bucket paces requests to the API's allowed rate. Results are
+        # deduplicated as pages stream in.
+        try:
+            await asyncio.gather(*(
+                collect(category, location)
+                for location in self.target_areas
+                for category in categories
+            ))
+        finally:
+            await self.yelp.close()
+        print(f"📦 Yelp cache: {self.yelp.cache_hits} hits, {self.yelp.cache_misses} misses")
         
-        # Remove duplicates and filter
-        unique_companies = {c['website']: c for c in all_companies}.values()
-        filtered_companies = list(unique_companies)[:limit]
+        filtered_companies = list(unique_companies.values())[:limit]
         
         print(f"\n🎯 Found {len(filtered_companies)} potential small businesses")
         return filtered_companies
 
-    def save_companies(self, companies: List[Dict], filename: str = "discovered_companies.json"):
-        """Save discovered companies to file"""
-        with open(filename, 'w') as f:
-            json.dump(companies, f, indent=2) 
\ No newline at end of file
+    def save_companies(self, companies: List[Dict], path: str = LEAD_STORE_PATH):
+        """Save discovered companies to the lead store"""
+        with LeadStore(path) as store:
+            store.upsert(companies) 
\ No newline at end of file
@@ -1,130 +1,298 @@
 import re
-import whois
+import asyncio
 import requests
-from bs4 import BeautifulSoup
-from typing import Dict
+from bs4 import BeautifulSoup, Tag
+from concurrent.futures import Executor
+from typing import Callable, Dict, List, Optional
 import aiohttp
-from urllib.parse import urljoin
+from urllib.parse import urljoin, urlsplit
+from config import HTML_PARSER, CRAWL_MAX_LINKS
+from scanners.whois_stage import WhoisStage, fetch_whois, registrable_domain
+from scanners.http_client import PageCache, fetch_parsed
+from scanners.crawler import DomainCrawler
+
+EMAIL_PATTERN = re.compile(r'[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}')
+PHONE_PATTERN = re.compile(r'\(?\d{3}\)?[-.\s]?\d{3}[-.\s]?\d{4}')
+CONTACT_LINK_PATTERN = re.compile(r'contact|about', re.I)
+
+# Checked in this order; the first link matching each platform is kept
+SOCIAL_PATTERNS = [
+    ('linkedin', re.compile(r'linkedin\.com/(?:company|in)/')),
+    ('facebook', re.compile(r'facebook\.com/')),
+    ('twitter', re.compile(r'twitter\.com/')),
+    ('instagram', re.compile(r'instagram\.com/')),
+    ('youtube', re.compile(r'youtube\.com/'))
+]
+
+# Earlier keywords win; each matches against individual class names
+HOURS_PATTERNS = [re.compile(keyword, re.I) for keyword in ['hours', 'schedule', 'timing', 'open']]
+
+CONTACT_ACTIONS = ['contact', 'enquiry', 'feedback']
+CONTACT_FIELDS = ['contact', 'email', 'message', 'name', 'phone']
+
+def _is_contact_form(action: str, input_names: List[str]) -> bool:
+    """Check if a form is likely a contact form"""
+    # Check form action
+    action = action.lower()
+    if any(ind in action for ind in CONTACT_ACTIONS):
+        return True
+
+    # Check input fields
+    names = ' '.join(name.lower() for name in input_names)
+    return any(ind in names for ind in CONTACT_FIELDS)
+
+def empty_contacts() -> Dict:
+    """Result skeleton returned by ContactScanner.scan"""
+    return {
+        'emails': [],
+        'phones': [],
+        'social_media': [],
+        'contact_page': None,
+        'forms': [],
+        'business_hours': None,
+        'whois_info': {}
+    }
+
+def _site_link(url: str, href: str, site: str) -> Optional[str]:
+    """`href` made absolute if it is an http(s) link within `site`"""
+    href = href.strip()
+    if not href or href.startswith('#'):
+        return None
+    if ':' not in href.split('/', 1)[0] and not href.startswith('//'):
+        return urljoin(url, href)  # relative, so on the page's own host
+    try:
+        link = urljoin(url, href.strip())
+        parts = urlsplit(link)
+    except ValueError:
+        return None
+    if parts.scheme not in ('http', 'https') or not parts.hostname:
+        return None
+    if registrable_domain(parts.hostname) != site:
+        return None
+    return link
+
+def extract_page(soup: BeautifulSoup, url: str) -> Dict:
+    """Extract contact details, the contact page link and contact forms.
+
+    Walks the document once: text nodes feed the email and phone search
+    (the same strings soup.get_text() would join), and each tag is checked
+    for social links, the contact link, hours sections and form fields.
+    Up to CRAWL_MAX_LINKS same-site links are kept for the crawler.
+    """
+    page = {
+        'emails': [],
+        'phones': [],
+        'social_media': [],
+        'business_hours': None,
+        'contact_link': None,
+        'forms': [],
+        'links': []
+    }
+    site = registrable_domain(urlsplit(url).hostname or '')
+    links = {}
+    text_types = soup.interesting_string_types
+    texts = []
+    social_links = {}
+    hours_section = None
+    hours_rank = len(HOURS_PATTERNS)  # index of the best keyword matched so far
+    forms = {}  # id(form tag) -> (tag, input names, input fields)
+
+    for node in soup.descendants:
+        if not isinstance(node, Tag):
+            node_type = type(node)
+            if node_type is text_types if isinstance(text_types, type) else node_type in text_types:
+                texts.append(node)
+            continue
+
+        name = node.name
+        if name == 'a':
+            href = node.get('href')
+            if href is not None:
+                if len(social_links) < len(SOCIAL_PATTERNS):
+                    for platform, pattern in SOCIAL_PATTERNS:
+                        if platform not in social_links and pattern.search(href):
+                            social_links[platform] = href
+                if page['contact_link'] is None and CONTACT_LINK_PATTERN.search(href):
+                    page['contact_link'] = urljoin(url, href)
+                if len(links) < CRAWL_MAX_LINKS:
+                    link = _site_link(url, href, site)
+                    if link is not None:
+                        links[link] = None
+        elif name == 'form':
+            forms[id(node)] = (node, [], [])
+        elif name == 'input' or name == 'textarea':
+            for parent in node.parents:
+                if parent.name == 'form' and id(parent) in forms:
+                    _, input_names, fields = forms[id(parent)]
+                    input_name = node.get('name', '')
+                    input_names.append(input_name)
+                    if name == 'input':
+                        fields.append(input_name)
+
+        if hours_rank:
+            classes = node.get('class')
+            if classes:
+                if isinstance(classes, str):
+                    classes = [classes]
+                for rank in range(hours_rank):
+                    if any(HOURS_PATTERNS[rank].search(c) for c in classes):
+                        hours_section, hours_rank = node, rank
+                        break
+
+    # Extract emails and phones
+    text = ''.join(texts)
+    page['emails'].extend(list(set(EMAIL_PATTERN.findall(text))))
+    page['phones'].extend(list(set(PHONE_PATTERN.findall(text))))
+
+    for platform, _ in SOCIAL_PATTERNS:
+        if platform in social_links:
+            page['social_media'].append({
+                'platform': platform,
+                'url': social_links[platform]
+            })
+
+    if hours_section is not None:
+        page['business_hours'] = hours_section.get_text(strip=True)
+
+    page['links'] = list(links)
+
+    # Keep the contact forms
+    for form, input_names, fields in forms.values():
+        if _is_contact_form(form.get('action', ''), input_names):
+            page['forms'].append({
+                'action': form.get('action', ''),
+                'method': form.get('method', 'post'),
+                'fields': fields
+            })
+
+    return page
+
+def parse_page(body: bytes, url: str, encoding: Optional[str] = None) -> Dict:
+    """Parse raw page bytes and run extract_page on the result.
+
+    This is the CPU-bound half of a scan. It takes and returns only plain
+    data so it can run in a ProcessPoolExecutor.
+    """
+    soup = BeautifulSoup(body, HTML_PARSER, from_encoding=encoding)
+    return extract_page(soup, url)
+
+def _merge_contact_info(contacts: Dict, page: Dict):
+    """Fold the contact details parsed from one page into `contacts`"""
+    contacts['emails'].extend(page['emails'])
+    contacts['phones'].extend(page['phones'])
+    contacts['social_media'].extend(page['social_media'])
+    if page['business_hours'] is not None:
+        contacts['business_hours'] = page['business_hours']
+
+def _dedupe_contacts(contacts: Dict):
+    """Drop repeats gathered from several pages, keeping first-seen order"""
+    contacts['emails'] = list(dict.fromkeys(contacts['emails']))
+    contacts['phones'] = list(dict.fromkeys(contacts['phones']))
+    for key, identity in [('social_media', lambda s: (s['platform'], s['url'])),
+                          ('forms', lambda f: (f['action'], f['method'], tuple(f['fields'])))]:
+        unique = {}
+        for item in contacts[key]:
+            unique.setdefault(identity(item), item)
+        contacts[key] = list(unique.values())
 
 class ContactScanner:
-    def __init__(self, url: str):
+    def __init__(self, url: str, session: Optional[aiohttp.ClientSession] = None,
+                 executor: Optional[Executor] = None, whois_stage: Optional[WhoisStage] = None,
+                 page_cache: Optional[PageCache] = None, crawl: bool = False,
+                 whois: bool = True):
         self.url = url
         self.domain = self._extract_domain(url)
-        
+        self.session = session  # shared pooled session, see scanners.http_client
+        self.executor = executor  # process pool for parse_page, None parses inline
+        self.whois_stage = whois_stage  # cached, rate-limited WHOIS; None queries directly
+        self.page_cache = page_cache  # conditional re-scans; None always downloads and parses
+        self.crawl = crawl  # budgeted crawl of the site instead of just the contact page
+        self.whois = whois  # False leaves whois_info None for the caller to look up
+
     def _extract_domain(self, url: str) -> str:
         """Extract domain from URL without protocol and www."""
         domain = re.sub(r'https?://(www\.)?', '', url)
         return domain.split('/')[0]
-        
-    def _is_contact_form(self, form: BeautifulSoup) -> bool:
-        """Check if a form is likely a contact form"""
-        contact_indicators = ['contact', 'email', 'message', 'name', 'phone']
-        
-        # Check form action
-        action = form.get('action', '').lower()
-        if any(ind in action for ind in ['contact', 'enquiry', 'feedback']):
-            return True
-            
-        # Check input fields
-        inputs = form.find_all(['input', 'textarea'])
-        input_names = [i.get('name', '').lower() for i in inputs]
-        if any(ind in ' '.join(input_names) for ind in contact_indicators):
-            return True
-            
-        return False
-        
-    def _extract_contact_info(self, soup: BeautifulSoup, contacts: Dict):
-        """Extract contact information from HTML"""
-        # Extract emails
-        text = soup.get_text()
-        emails = re.findall(r'[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}', text)
-        contacts['emails'].extend(list(set(emails)))
-        
-        # Extract phones
-        phones = re.findall(r'\(?\d{3}\)?[-.\s]?\d{3}[-.\s]?\d{4}', text)
-        contacts['phones'].extend(list(set(phones)))
-        
-        # Find social media links
-        social_patterns = {
-            'linkedin': r'linkedin\.com/(?:company|in)/',
-            'facebook': r'facebook\.com/',
-            'twitter': r'twitter\.com/',
-            'instagram': r'instagram\.com/',
-            'youtube': r'youtube\.com/'
-        }
-        
-        for platform, pattern in social_patterns.items():
-            links = soup.find_all('a', href=re.compile(pattern))
-            if links:
-                contacts['social_media'].append({
-                    'platform': platform,
-                    'url': links[0]['href']
-                })
-                
-        # Try to find business hours
-        hours_keywords = ['hours', 'schedule', 'timing', 'open']
-        for keyword in hours_keywords:
-            hours_section = soup.find(class_=re.compile(keyword, re.I))
-            if hours_section:
-                contacts['business_hours'] = hours_section.get_text(strip=True)
-                break
-                
-    async def scan(self) -> Dict:
-        """Scan website for contact information"""
-        contacts = {
-            'emails': [],
-            'phones': [],
-            'social_media': [],
-            'contact_page': None,
-            'forms': [],
-            'business_hours': None,
-            'whois_info': {}
-        }
-        
+
+    async def scan(self, page: Optional[Dict] = None) -> Dict:
+        """Scan website for contact information.
+
+        `page` is the homepage already run through parse_page (or any parser
+        returning the same keys); when given it is not downloaded again.
+        """
+        contacts = empty_contacts()
+
         try:
-            async with aiohttp.ClientSession() as session:
-                async with session.get(self.url, timeout=30) as response:
-                    if response.status == 200:
-                        html = await response.text()
-                        soup = BeautifulSoup(html, 'html.parser')
-                        
-                        # Find contact page
-                        contact_links = soup.find_all('a', href=re.compile(r'contact|about', re.I))
-                        if contact_links:
-                            contacts['contact_page'] = urljoin(self.url, contact_links[0]['href'])
-                            
-                            # Scan contact page
-                            async with session.get(contacts['contact_page']) as contact_response:
-                                if contact_response.status == 200:
-                                    contact_html = await contact_response.text()
-                                    contact_soup = BeautifulSoup(contact_html, 'html.parser')
-                                    self._extract_contact_info(contact_soup, contacts)
-                        
-                        # Extract from main page too
-                        self._extract_contact_info(soup, contacts)
-                        
-                        # Find contact forms
-                        forms = soup.find_all('form')
-                        for form in forms:
-                            if self._is_contact_form(form):
-                                contacts['forms'].append({
-                                    'action': form.get('action', ''),
-                                    'method': form.get('method', 'post'),
-                                    'fields': [i.get('name', '') for i in form.find_all('input')]
-                                })
-                        
-                        # Get WHOIS information
-                        try:
-                            w = whois.whois(self.domain)
-                            contacts['whois_info'] = {
-                                'registrar': w.registrar,
-                                'creation_date': w.creation_date,
-                                'emails': w.emails
-                            }
-                        except Exception as e:
-                            print(f"WHOIS lookup failed for {self.domain}: {str(e)}")
-                        
+            if self.session is not None:
+                await self._scan_pages(self.session, contacts, page)
+            else:
+                timeout = aiohttp.ClientTimeout(total=30)
+                async with aiohttp.ClientSession(timeout=timeout) as session:
+                    await self._scan_pages(session, contacts, page)
         except Exception as e:
             print(f"Error scanning {self.url}: {str(e)}")
-            
-        return contacts 
\ No newline at end of file
+            contacts['error'] = str(e)
+
+        return contacts
+
+    async def fetch_and_parse(self, session: aiohttp.ClientSession, url: str,
+                              parser: Callable[..., Dict] = parse_page) -> Optional[Dict]:
+        """Download `url` and run `parser(body, url, charset)` on it.
+
+        See scanners.http_client.fetch_parsed; unchanged pages reuse the
+        result stored in the page cache. Returns None for non-200 and
+        non-HTML responses; bodies are capped at HTTP_MAX_BODY_BYTES.
+        """
+        return await fetch_parsed(session, url, parser, self.executor, self.page_cache)
+
+    async def _scan_pages(self, session: aiohttp.ClientSession, contacts: Dict, page: Optional[Dict]):
+        """Fetch the homepage (unless given) and contact page through `session`"""
+        if page is None:
+            page = await self.fetch_and_parse(session, self.url)
+            if page is None:
+                return
+
+        # WHOIS runs alongside the contact page fetch
+        whois_task = asyncio.ensure_future(self._lookup_whois()) if self.whois else None
+
+        try:
+            if self.crawl:
+                await self._crawl(session, contacts, page)
+            # Scan contact page
+            elif page['contact_link']:
+                contacts['contact_page'] = page['contact_link']
+                contact_page = await self.fetch_and_parse(session, contacts['contact_page'])
+                if contact_page is not None:
+                    _merge_contact_info(contacts, contact_page)
+        except BaseException:
+            if whois_task is not None:
+                whois_task.cancel()
+            raise
+
+        # Extract from main page too
+        _merge_contact_info(contacts, page)
+        contacts['forms'] = page['forms'] + contacts['forms']
+        if self.crawl:
+            _dedupe_contacts(contacts)
+
+        contacts['whois_info'] = await whois_task if whois_task is not None else None
+
+    async def _crawl(self, session: aiohttp.ClientSession, contacts: Dict, page: Dict):
+        """Merge contact details from the pages a DomainCrawler reaches from the homepage"""
+        contacts['contact_page'] = page['contact_link']
+        contacts['crawled_pages'] = []
+        crawler = DomainCrawler(session, self.url, parse_page, self.executor, self.page_cache)
+        async for url, crawled in crawler.crawl(page):
+            contacts['crawled_pages'].append(url)
+            _merge_contact_info(contacts, crawled)
+            contacts['forms'].extend(crawled['forms'])
+
+    async def _lookup_whois(self) -> Dict:
+        """Get WHOIS information without blocking the event loop"""
+        if self.whois_stage is not None:
+            return await self.whois_stage.lookup(self.domain)
+        try:
+            return await asyncio.to_thread(fetch_whois, self.domain)
+        except Exception as e:
+            print(f"WHOIS lookup failed for {self.domain}: {str(e)}")
+            return {}
@@ -0,0 +1,138 @@
+import asyncio
+import heapq
+import re
+from concurrent.futures import Executor
+from typing import AsyncIterator, Callable, Dict, List, Optional, Tuple
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+import aiohttp
+from config import CRAWL_MAX_PAGES, CRAWL_MAX_BYTES, CRAWL_CONCURRENCY
+from scanners.http_client import ByteBudget, PageCache, fetch_parsed
+from scanners.whois_stage import registrable_domain
+
+# Lower ranks are fetched first; unmatched pages rank after all of these
+PAGE_PRIORITIES = [
+    (re.compile(r'contact|get-in-touch|reach-us', re.I), 0),
+    (re.compile(r'about|who-we-are|our-story', re.I), 1),
+    (re.compile(r'team|staff|people|leadership|our-doctors', re.I), 2),
+    (re.compile(r'locations?|directions|find-us|visit|hours', re.I), 2),
+    (re.compile(r'support|help|faq|quote|book|appointment', re.I), 3)
+]
+DEFAULT_PRIORITY = 10
+
+SKIPPED_EXTENSIONS = re.compile(
+    r'\.(?:pdf|jpe?g|png|gif|svg|webp|ico|css|js|json|xml|zip|gz|mp3|mp4|mov|avi|docx?|xlsx?|pptx?)$',
+    re.I
+)
+TRACKING_PARAMS = re.compile(r'^(?:utm_\w+|fbclid|gclid|mc_cid|mc_eid)$', re.I)
+
+def normalize_url(url: str) -> Optional[str]:
+    """Canonical form used to dedupe URLs, or None for links not worth fetching.
+
+    Lowercases scheme and host, drops default ports, fragments and tracking
+    parameters, sorts the query and treats an empty path as '/'.
+    """
+    try:
+        parts = urlsplit(url.strip())
+        port = parts.port
+    except ValueError:
+        return None
+    scheme = parts.scheme.lower()
+    if scheme not in ('http', 'https') or not parts.hostname:
+        return None
+    path = parts.path or '/'
+    if SKIPPED_EXTENSIONS.search(path):
+        return None
+    netloc = parts.hostname
+    if port is not None and port != {'http': 80, 'https': 443}[scheme]:
+        netloc = f"{netloc}:{port}"
+    query = urlencode(sorted((k, v) for k, v in parse_qsl(parts.query, keep_blank_values=True)
+                             if not TRACKING_PARAMS.match(k)))
+    return urlunsplit((scheme, netloc, path, query, ''))
+
+def page_priority(url: str) -> int:
+    path = urlsplit(url).path
+    for pattern, rank in PAGE_PRIORITIES:
+        if pattern.search(path):
+            return rank
+    return DEFAULT_PRIORITY
+
+class DomainCrawler:
+    """Budgeted crawl of one site, most promising pages first.
+
+    Links come from each parsed page's 'links' (same-site links collected
+    by extract_page); the start page's 'contact_link' is always queued too,
+    in case it fell past the link cap. The frontier is a heap ordered by page_priority, then
+    link depth, then discovery order; URLs are normalized and fetched at most
+    once. At most `max_pages` pages (the start page included) and roughly
+    `max_bytes` of response bodies are fetched, `concurrency` at a time.
+    """
+
+    def __init__(self, session: aiohttp.ClientSession, start_url: str, parser: Callable[..., Dict],
+                 executor: Optional[Executor] = None, page_cache: Optional[PageCache] = None,
+                 max_pages: int = CRAWL_MAX_PAGES, max_bytes: int = CRAWL_MAX_BYTES,
+                 concurrency: int = CRAWL_CONCURRENCY):
+        self.session = session
+        self.start_url = start_url
+        self.site = registrable_domain(urlsplit(start_url).hostname or '')
+        self.parser = parser
+        self.executor = executor
+        self.page_cache = page_cache
+        self.max_pages = max_pages
+        self.budget = ByteBudget(max_bytes)
+        self.concurrency = concurrency
+        self.fetched = 0
+        self._frontier: List[Tuple[int, int, int, str]] = []
+        self._seen = set()
+        self._order = 0
+
+    def _enqueue(self, links: List[str], depth: int):
+        for link in links:
+            url = normalize_url(link)
+            if url is None or url in self._seen:
+                continue
+            self._seen.add(url)
+            self._order += 1
+            heapq.heappush(self._frontier, (page_priority(url), depth, self._order, url))
+
+    async def _fetch(self, url: str, depth: int) -> Tuple[str, int, Optional[Dict]]:
+        try:
+            page = await fetch_parsed(self.session, url, self.parser, self.executor,
+                                      self.page_cache, budget=self.budget)
+        except Exception as e:  # one bad page shouldn't end the site's crawl
+            print(f"Error crawling {url}: {str(e)}")
+            page = None
+        return url, depth, page
+
+    async def crawl(self, start_page: Dict) -> AsyncIterator[Tuple[str, Dict]]:
+        """Yield (url, parsed page) for each page fetched beyond `start_page`,
+        which is the start URL already run through the parser"""
+        start = normalize_url(self.start_url)
+        if start is not None:
+            self._seen.add(start)
+        links = start_page.get('links', [])
+        contact_link = start_page.get('contact_link')
+        if contact_link and registrable_domain(urlsplit(contact_link).hostname or '') == self.site:
+            links = [contact_link] + links
+        self._enqueue(links, 1)
+        self.fetched = 1
+
+        running = set()
+        try:
+            while self._frontier or running:
+                while (self._frontier and len(running) < self.concurrency and
+                       self.fetched < self.max_pages and not self.budget.exhausted):
+                    _, depth, _, url = heapq.heappop(self._frontier)
+                    self.fetched += 1
+                    running.add(asyncio.ensure_future(self._fetch(url, depth)))
+                if not running:
+                    break
+                done, running = await asyncio.wait(running, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    url, depth, page = task.result()
+                    if page is None:
+                        continue
+                    self._enqueue(page.get('links', []), depth + 1)
+                    yield url, page
+        finally:
+            for task in running:
+                task.cancel()
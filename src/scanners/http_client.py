@@ -0,0 +1,240 @@
+import asyncio
+import hashlib
+import aiohttp
+from concurrent.futures import Executor
+from typing import Callable, Dict, List, Optional, Tuple
+from cache import DiskCache
+from config import (
+    MAX_TIMEOUT, USER_AGENT, HTTP_POOL_LIMIT, HTTP_POOL_LIMIT_PER_HOST,
+    HTTP_CONNECT_TIMEOUT, HTTP_KEEPALIVE_TIMEOUT, HTTP_READ_TIMEOUT, DNS_CACHE_TTL,
+    HTTP_MAX_BODY_BYTES, HTTP_READ_CHUNK, HTTP_CONTENT_TYPES, PAGE_CACHE_PATH, PAGE_CACHE_TTL,
+    HTML_PARSER
+)
+
+# Part of every page cache key. Bump it whenever a parser's output changes
+# (new keys, different extraction) so stale stored results are not reused.
+PAGE_CACHE_SCHEMA = 2
+
+class HTTPClient:
+    """Scan-wide aiohttp session backed by a single pooled connector.
+
+    Create one per run and hand `client.session` to every scanner so
+    connections, DNS lookups and TLS sessions are reused across sites.
+    """
+
+    def __init__(self, limit: int = HTTP_POOL_LIMIT,
+                 limit_per_host: int = HTTP_POOL_LIMIT_PER_HOST,
+                 timeout: float = MAX_TIMEOUT,
+                 connect_timeout: float = HTTP_CONNECT_TIMEOUT,
+                 keepalive_timeout: float = HTTP_KEEPALIVE_TIMEOUT,
+                 read_timeout: float = HTTP_READ_TIMEOUT,
+                 dns_cache_ttl: int = DNS_CACHE_TTL):
+        self.limit = limit
+        self.limit_per_host = limit_per_host
+        self.timeout = aiohttp.ClientTimeout(total=timeout, connect=connect_timeout,
+                                             sock_read=read_timeout)
+        self.keepalive_timeout = keepalive_timeout
+        self.dns_cache_ttl = dns_cache_ttl
+        self.session = None
+
+    async def __aenter__(self) -> 'HTTPClient':
+        await self.open()
+        return self
+
+    async def __aexit__(self, *exc_info):
+        await self.close()
+
+    async def open(self) -> aiohttp.ClientSession:
+        """Create the pooled session (must be called inside the event loop)"""
+        if self.session is None:
+            connector = aiohttp.TCPConnector(
+                limit=self.limit,
+                limit_per_host=self.limit_per_host,
+                use_dns_cache=True,
+                ttl_dns_cache=self.dns_cache_ttl,
+                keepalive_timeout=self.keepalive_timeout
+            )
+            self.session = aiohttp.ClientSession(
+                connector=connector,
+                timeout=self.timeout,
+                headers={'User-Agent': USER_AGENT}
+            )
+        return self.session
+
+    async def close(self):
+        if self.session is not None:
+            await self.session.close()
+            self.session = None
+
+class PageCache:
+    """Per-URL validators (ETag, Last-Modified), content hash and parsed
+    result from the last scan, so re-scans can skip unchanged pages.
+
+    Entries are keyed by PAGE_CACHE_SCHEMA, HTML_PARSER, the parser and the
+    URL, so changing any of them invalidates what was stored. SQLite work
+    runs on a thread, and writes are buffered and committed `batch_size`
+    at a time (and on close).
+    """
+
+    def __init__(self, path: str = PAGE_CACHE_PATH, ttl: float = PAGE_CACHE_TTL,
+                 batch_size: int = 100):
+        self.cache = DiskCache(path, ttl=ttl)
+        self.batch_size = batch_size
+        self.not_modified = 0  # 304 responses
+        self.unchanged = 0  # 200 responses with the same content hash
+        self.parsed = 0
+        self.skipped = 0  # responses that are not HTML
+        self.truncated = 0  # bodies cut off at the size cap
+        self._pending: Dict[str, Dict] = {}
+        self._writing: Dict[str, Dict] = {}
+
+    def _key(self, parser: Callable, url: str) -> str:
+        return f"{PAGE_CACHE_SCHEMA}:{HTML_PARSER}:{parser.__module__}.{parser.__name__}:{url}"
+
+    async def get(self, parser: Callable, url: str) -> Optional[Dict]:
+        key = self._key(parser, url)
+        entry = self._pending.get(key) or self._writing.get(key)
+        if entry is not None:
+            return entry
+        return await asyncio.to_thread(self.cache.get, key)
+
+    async def set(self, parser: Callable, url: str, entry: Dict):
+        self._pending[self._key(parser, url)] = entry
+        if len(self._pending) >= self.batch_size:
+            await self.flush()
+
+    async def flush(self):
+        """Commit the buffered entries in one transaction"""
+        if not self._pending:
+            return
+        batch, self._pending = self._pending, {}
+        self._writing.update(batch)
+        try:
+            await asyncio.to_thread(self.cache.set_many, batch)
+        finally:
+            for key, entry in batch.items():
+                if self._writing.get(key) is entry:
+                    del self._writing[key]
+
+    def summary(self) -> str:
+        return (f"Page cache: {self.not_modified} not modified, "
+                f"{self.unchanged} unchanged, {self.parsed} parsed, "
+                f"{self.skipped} skipped (not HTML), {self.truncated} truncated")
+
+    def close(self):
+        if self._pending:
+            self.cache.set_many(self._pending)
+            self._pending = {}
+        self.cache.close()
+
+class ByteBudget:
+    """Response bytes a caller may still download (e.g. one site's crawl)"""
+
+    def __init__(self, limit: int):
+        self.remaining = limit
+
+    @property
+    def exhausted(self) -> bool:
+        return self.remaining <= 0
+
+    def spend(self, size: int):
+        self.remaining -= size
+
+def is_html(response: aiohttp.ClientResponse, allowed: List[str] = HTTP_CONTENT_TYPES) -> bool:
+    """Whether the declared content type is one we parse (undeclared counts as HTML)"""
+    if 'Content-Type' not in response.headers:
+        return True
+    return response.content_type in allowed
+
+async def read_body(response: aiohttp.ClientResponse,
+                    max_bytes: int = HTTP_MAX_BODY_BYTES) -> Tuple[bytes, bool]:
+    """Read the body in chunks, stopping at `max_bytes`. Returns the body and
+    whether it was cut short; the connection is closed rather than drained
+    when it was.
+    """
+    chunks = []
+    size = 0
+    async for chunk in response.content.iter_chunked(HTTP_READ_CHUNK):
+        chunks.append(chunk)
+        size += len(chunk)
+        if size >= max_bytes:
+            break
+    else:
+        return b''.join(chunks), False
+    response.close()
+    return b''.join(chunks)[:max_bytes], True
+
+async def fetch_parsed(session: aiohttp.ClientSession, url: str, parser: Callable[..., Dict],
+                       executor: Optional[Executor] = None,
+                       page_cache: Optional[PageCache] = None,
+                       max_bytes: int = HTTP_MAX_BODY_BYTES,
+                       budget: Optional[ByteBudget] = None) -> Optional[Dict]:
+    """Download `url` and return `parser(body, url, charset)`.
+
+    With a page cache the request is conditional: a 304, or a 200 whose
+    body hashes the same as last time, returns the stored result without
+    parsing. The parser runs in `executor` when given, so it must be a
+    picklable module-level function. Returns None for other statuses and
+    for content types outside HTTP_CONTENT_TYPES. At most `max_bytes` of
+    the body are read, fewer if `budget` has less left, and the bytes
+    read are charged to it. Nothing is fetched once the budget is spent,
+    and a body the budget cut short is parsed but never cached, since it
+    is not what the URL serves.
+    """
+    if budget is not None and budget.exhausted:
+        return None
+    entry = await page_cache.get(parser, url) if page_cache is not None else None
+    headers = {}
+    if entry is not None:
+        if entry.get('etag'):
+            headers['If-None-Match'] = entry['etag']
+        if entry.get('last_modified'):
+            headers['If-Modified-Since'] = entry['last_modified']
+
+    async with session.get(url, headers=headers) as response:
+        if response.status == 304 and entry is not None:
+            page_cache.not_modified += 1
+            return entry['result']
+        if response.status != 200:
+            return None
+        if not is_html(response):
+            response.close()
+            if page_cache is not None:
+                page_cache.skipped += 1
+            return None
+        budget_limited = budget is not None and budget.remaining < max_bytes
+        if budget_limited:
+            max_bytes = budget.remaining
+        body, cut_short = await read_body(response, max_bytes)
+        if budget is not None:
+            budget.spend(len(body))
+        encoding = response.charset
+        etag = response.headers.get('ETag')
+        last_modified = response.headers.get('Last-Modified')
+
+    if page_cache is None or (cut_short and budget_limited):
+        return await _run_parser(parser, executor, body, url, encoding)
+    if cut_short and len(body) >= max_bytes:
+        page_cache.truncated += 1
+
+    digest = hashlib.sha256(body).hexdigest()
+    if entry is not None and entry['hash'] == digest:
+        page_cache.unchanged += 1
+        result = entry['result']
+    else:
+        page_cache.parsed += 1
+        result = await _run_parser(parser, executor, body, url, encoding)
+    await page_cache.set(parser, url, {
+        'etag': etag,
+        'last_modified': last_modified,
+        'hash': digest,
+        'result': result
+    })
+    return result
+
+async def _run_parser(parser: Callable[..., Dict], executor: Optional[Executor],
+                      body: bytes, url: str, encoding: Optional[str]) -> Dict:
+    if executor is None:
+        return parser(body, url, encoding)
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(executor, parser, body, url, encoding)
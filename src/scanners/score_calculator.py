@@ -1,36 +1,94 @@
+from typing import Dict
+import numpy as np
+import pandas as pd
+from config import SCORE_WEIGHTS, SCORE_THRESHOLDS
+
+# Reason bits, in the order reasons are listed
+MANY_SEO_ISSUES = 1
+NOT_MOBILE_FRIENDLY = 2
+SECURITY_ISSUES = 4
+POOR_PERFORMANCE = 8
+OUTDATED_TECH = 16
+
+REASONS = [
+    (MANY_SEO_ISSUES, "Multiple SEO issues need attention"),
+    (NOT_MOBILE_FRIENDLY, "Not mobile-friendly"),
+    (SECURITY_ISSUES, "Security vulnerabilities detected"),
+    (POOR_PERFORMANCE, "Poor website performance"),
+    (OUTDATED_TECH, "Using outdated technology")
+]
+
+# flag_reason text for every possible bitmask, so masks can be decoded by indexing
+REASON_TEXT = np.array([
+    '; '.join(text for bit, text in REASONS if mask & bit)
+    for mask in range(1 << len(REASONS))
+], dtype=object)
+
+# Feature columns for calculate_scores and the value used when one is missing
+FEATURE_DEFAULTS = {
+    'seo_issues': 0,  # issue count
+    'mobile_friendly': True,
+    'security_issues': 0,  # issue count
+    'performance_score': 0,
+    'outdated_tech': False
+}
+
 class ScoreCalculator:
+    def __init__(self, weights: Dict[str, float] = SCORE_WEIGHTS,
+                 thresholds: Dict[str, float] = SCORE_THRESHOLDS):
+        self.weights = weights
+        self.thresholds = thresholds
+
+    def _score(self, seo_issues, mobile_friendly, security_issues, performance_score, outdated_tech):
+        """Scores and reason masks for scalars or equal-length arrays of features"""
+        seo_issues = np.asarray(seo_issues, dtype=np.int64)
+        not_mobile = ~np.asarray(mobile_friendly, dtype=bool)
+        security_issues = np.asarray(security_issues, dtype=np.int64)
+        poor_performance = np.asarray(performance_score, dtype=np.float64) < self.thresholds['poor_performance']
+        outdated_tech = np.asarray(outdated_tech, dtype=bool)
+
+        penalty = (seo_issues * self.weights['seo_issue'] +
+                   not_mobile * self.weights['not_mobile_friendly'] +
+                   security_issues * self.weights['security_issue'] +
+                   poor_performance * self.weights['poor_performance'] +
+                   outdated_tech * self.weights['outdated_tech'])
+        score = np.maximum(0, 100 - penalty)  # Don't go below 0
+
+        reasons = ((seo_issues > self.thresholds['many_seo_issues']) * MANY_SEO_ISSUES |
+                   not_mobile * NOT_MOBILE_FRIENDLY |
+                   (security_issues > 0) * SECURITY_ISSUES |
+                   poor_performance * POOR_PERFORMANCE |
+                   outdated_tech * OUTDATED_TECH)
+        return score, reasons.astype(np.uint8)
+
     def calculate_score(self, scan_results: dict) -> dict:
-        score = 0
-        reasons = []
-        
-        # SEO Issues (-10 points each)
-        if scan_results.get('seo_issues'):
-            score -= len(scan_results['seo_issues']) * 10
-            if len(scan_results['seo_issues']) > 3:
-                reasons.append("Multiple SEO issues need attention")
-        
-        # Mobile Issues (-20 points)
-        if not scan_results.get('mobile_friendly', True):
-            score -= 20
-            reasons.append("Not mobile-friendly")
-        
-        # Security Issues (-15 points each)
-        if scan_results.get('security_issues'):
-            score -= len(scan_results['security_issues']) * 15
-            reasons.append("Security vulnerabilities detected")
-        
-        # Performance Score
-        performance = scan_results.get('performance_score', 0)
-        if performance < 50:
-            score -= 20
-            reasons.append("Poor website performance")
-        
-        # Outdated Technology
-        if scan_results.get('outdated_tech'):
-            score -= 15
-            reasons.append("Using outdated technology")
-        
+        score, reasons = self._score(
+            len(scan_results.get('seo_issues') or []),
+            scan_results.get('mobile_friendly', True),
+            len(scan_results.get('security_issues') or []),
+            scan_results.get('performance_score', 0),
+            bool(scan_results.get('outdated_tech'))
+        )
         return {
-            'score': max(0, 100 + score),  # Don't go below 0
-            'flag_reason': '; '.join(reasons)
-        } 
\ No newline at end of file
+            'score': score.item(),
+            'flag_reason': REASON_TEXT[reasons]
+        }
+
+    def calculate_scores(self, features: pd.DataFrame) -> pd.DataFrame:
+        """Score a table with one row per scan and FEATURE_DEFAULTS columns.
+
+        Returns `score` and a `reasons` bitmask (see REASONS) aligned with
+        the input index; decode masks with reason_text().
+        """
+        columns = {}
+        for column, default in FEATURE_DEFAULTS.items():
+            if column in features:
+                columns[column] = features[column].fillna(default).to_numpy()
+            else:
+                columns[column] = np.full(len(features), default)
+        score, reasons = self._score(**columns)
+        return pd.DataFrame({'score': score, 'reasons': reasons}, index=features.index)
+
+def reason_text(reasons: pd.Series) -> pd.Series:
+    """flag_reason strings for a Series of reason bitmasks"""
+    return pd.Series(REASON_TEXT[reasons.to_numpy()], index=reasons.index)
@@ -1,11 +1,16 @@
-import requests
+import asyncio
+import threading
+import aiohttp
+import httplib2
 from bs4 import BeautifulSoup
-from typing import List, Dict
+from typing import List, Dict, Optional
 import os
 from dotenv import load_dotenv
 from urllib.parse import quote_plus
 from googleapiclient.discovery import build
 import re
+from scanners.http_client import PageCache, fetch_parsed, read_body
+from config import HTML_PARSER
 
 # Load environment variables
 load_dotenv()
@@ -16,11 +21,42 @@ MAX_TIMEOUT = 30
 GOOGLE_API_KEY = os.getenv('GOOGLE_API_KEY')
 GOOGLE_SEARCH_ENGINE_ID = os.getenv('GOOGLE_SEARCH_ENGINE_ID')
 
+# One Custom Search client per process; httplib2 is not thread-safe, so each
+# worker thread executes requests over its own Http object.
+_search_service = None
+_search_service_lock = threading.Lock()
+_thread_local = threading.local()
+
+def _get_search_service():
+    global _search_service
+    with _search_service_lock:
+        if _search_service is None:
+            _search_service = build('customsearch', 'v1', developerKey=GOOGLE_API_KEY,
+                                    cache_discovery=False)
+        return _search_service
+
+def _run_search(query: str) -> Dict:
+    """Blocking Custom Search call, meant to run in a worker thread"""
+    http = getattr(_thread_local, 'http', None)
+    if http is None:
+        http = _thread_local.http = httplib2.Http(timeout=MAX_TIMEOUT)
+    request = _get_search_service().cse().list(q=query, cx=GOOGLE_SEARCH_ENGINE_ID)
+    return request.execute(http=http)
+
+def check_seo_page(body: bytes, url: str, encoding: Optional[str] = None) -> Dict:
+    """Parse a page and return the issues and score of SEOScanner.check_page()"""
+    scanner = SEOScanner(url)
+    scanner.check_page(BeautifulSoup(body, HTML_PARSER, from_encoding=encoding))
+    return {'issues': scanner.issues, 'score': scanner.score}
+
 class SEOScanner:
-    def __init__(self, url: str):
+    def __init__(self, url: str, session: Optional[aiohttp.ClientSession] = None,
+                 page_cache: Optional[PageCache] = None):
         self.url = url
         self.domain = self._extract_domain(url)
         self.headers = {'User-Agent': USER_AGENT}
+        self.session = session  # shared pooled session, see scanners.http_client
+        self.page_cache = page_cache  # conditional re-scans; None always downloads and parses
         self.issues = []
         self.score = 0
         self.google_data = {}
@@ -30,25 +66,27 @@ class SEOScanner:
         domain = re.sub(r'https?://(www\.)?', '', url)
         return domain.split('/')[0]
 
-    async def scan(self) -> Dict:
+    def check_page(self, soup: BeautifulSoup):
+        """Run the on-page checks against an already parsed document"""
+        self._check_title(soup)
+        self._check_meta_description(soup)
+        self._check_h1(soup)
+        self._check_images_alt(soup)
+
+    async def scan(self, checked: Optional[Dict] = None, google: bool = True) -> Dict:
+        """Run the SEO checks without blocking the event loop.
+
+        `checked` holds the issues and score of check_page() already run on a
+        shared document (see scanners.site_scanner); when given the page is
+        not downloaded again. `google=False` skips the Custom Search checks.
+        """
         try:
-            # Basic SEO checks
-            response = requests.get(
-                self.url, 
-                headers=self.headers, 
-                timeout=MAX_TIMEOUT
-            )
-            soup = BeautifulSoup(response.text, 'html.parser')
-            
-            self._check_title(soup)
-            self._check_meta_description(soup)
-            self._check_h1(soup)
-            self._check_images_alt(soup)
-            
-            # Google-specific checks
-            await self._check_google_indexing()
-            await self._check_google_ranking()
-            await self._check_site_links()
+            if self.session is not None:
+                await self._scan(self.session, checked, google)
+            else:
+                timeout = aiohttp.ClientTimeout(total=MAX_TIMEOUT)
+                async with aiohttp.ClientSession(timeout=timeout, headers=self.headers) as session:
+                    await self._scan(session, checked, google)
             
             return {
                 'issues': self.issues,
@@ -64,78 +102,97 @@ class SEOScanner:
                 'google_data': {}
             }
 
-    async def _check_google_indexing(self):
+    async def _scan(self, session: aiohttp.ClientSession, checked: Optional[Dict], google: bool):
+        if checked is None:
+            # Basic SEO checks, skipped for pages unchanged since the last scan
+            checked = await fetch_parsed(session, self.url, check_seo_page, page_cache=self.page_cache)
+        if checked is not None:
+            self.issues.extend(checked['issues'])
+            self.score += checked['score']
+        else:
+            self.issues.append("Failed to fetch page for on-page checks")
+        
+        # Google-specific checks, issued concurrently
+        if google:
+            if GOOGLE_API_KEY:
+                brand_name = self.domain.split('.')[0]  # Simple brand name extraction
+                indexing, ranking, sitelinks = await asyncio.gather(
+                    self._search(f'site:{self.domain}'),
+                    self._search(brand_name),
+                    self._search(self.domain),
+                    return_exceptions=True
+                )
+                self._check_google_indexing(indexing)
+                self._check_google_ranking(ranking, brand_name)
+                self._check_site_links(sitelinks)
+            else:
+                await self._scrape_google_indexing(session)
+
+    async def _search(self, query: str) -> Dict:
+        return await asyncio.to_thread(_run_search, query)
+
+    def _check_google_indexing(self, result):
         """Check if the site is indexed in Google"""
         try:
-            if GOOGLE_API_KEY:
-                service = build('customsearch', 'v1', developerKey=GOOGLE_API_KEY)
-                result = service.cse().list(
-                    q=f'site:{self.domain}',
-                    cx=GOOGLE_SEARCH_ENGINE_ID
-                ).execute()
-                
-                indexed_pages = int(result.get('searchInformation', {}).get('totalResults', 0))
-                self.google_data['indexed_pages'] = indexed_pages
-                
-                if indexed_pages == 0:
-                    self.issues.append("Site not indexed in Google")
-                    self.score -= 30
-                else:
-                    self.score += 20
+            if isinstance(result, Exception):
+                raise result
+            indexed_pages = int(result.get('searchInformation', {}).get('totalResults', 0))
+            self.google_data['indexed_pages'] = indexed_pages
+            
+            if indexed_pages == 0:
+                self.issues.append("Site not indexed in Google")
+                self.score -= 30
             else:
-                # Fallback to scraping if no API key
-                search_url = f"https://www.google.com/search?q=site:{quote_plus(self.domain)}"
-                response = requests.get(search_url, headers=self.headers)
-                if "did not match any documents" in response.text:
-                    self.issues.append("Site not indexed in Google")
-                    self.score -= 30
+                self.score += 20
         except Exception as e:
             self.issues.append(f"Failed to check Google indexing: {str(e)}")
 
-    async def _check_google_ranking(self):
+    async def _scrape_google_indexing(self, session: aiohttp.ClientSession):
+        """Fallback indexing check by scraping if no API key"""
+        try:
+            search_url = f"https://www.google.com/search?q=site:{quote_plus(self.domain)}"
+            async with session.get(search_url, headers=self.headers) as response:
+                body, _ = await read_body(response)
+                text = body.decode(response.charset or 'utf-8', errors='replace')
+            if "did not match any documents" in text:
+                self.issues.append("Site not indexed in Google")
+                self.score -= 30
+        except Exception as e:
+            self.issues.append(f"Failed to check Google indexing: {str(e)}")
+
+    def _check_google_ranking(self, result, brand_name: str):
         """Check if the site ranks for its own brand name"""
         try:
-            brand_name = self.domain.split('.')[0]  # Simple brand name extraction
-            if GOOGLE_API_KEY:
-                service = build('customsearch', 'v1', developerKey=GOOGLE_API_KEY)
-                result = service.cse().list(
-                    q=brand_name,
-                    cx=GOOGLE_SEARCH_ENGINE_ID
-                ).execute()
-                
-                items = result.get('items', [])
-                found_position = None
-                for i, item in enumerate(items[:10]):
-                    if self.domain in item['link']:
-                        found_position = i + 1
-                        break
-                
-                self.google_data['brand_position'] = found_position
-                if not found_position or found_position > 5:
-                    self.issues.append(f"Site not ranking well for brand name '{brand_name}'")
-                    self.score -= 20
+            if isinstance(result, Exception):
+                raise result
+            items = result.get('items', [])
+            found_position = None
+            for i, item in enumerate(items[:10]):
+                if self.domain in item['link']:
+                    found_position = i + 1
+                    break
+            
+            self.google_data['brand_position'] = found_position
+            if not found_position or found_position > 5:
+                self.issues.append(f"Site not ranking well for brand name '{brand_name}'")
+                self.score -= 20
         except Exception as e:
             self.issues.append(f"Failed to check Google ranking: {str(e)}")
 
-    async def _check_site_links(self):
+    def _check_site_links(self, result):
         """Check if the site has sitelinks in Google"""
         try:
-            if GOOGLE_API_KEY:
-                service = build('customsearch', 'v1', developerKey=GOOGLE_API_KEY)
-                result = service.cse().list(
-                    q=self.domain,
-                    cx=GOOGLE_SEARCH_ENGINE_ID
-                ).execute()
-                
-                # Check for sitelinks in the search results
-                if 'items' in result and len(result['items']) > 0:
-                    first_result = result['items'][0]
-                    if 'sitelinks' in first_result:
-                        self.google_data['has_sitelinks'] = True
-                        self.score += 10
-                    else:
-                        self.google_data['has_sitelinks'] = False
-                        self.issues.append("No sitelinks in Google results")
+            if isinstance(result, Exception):
+                raise result
+            # Check for sitelinks in the search results
+            if 'items' in result and len(result['items']) > 0:
+                first_result = result['items'][0]
+                if 'sitelinks' in first_result:
+                    self.google_data['has_sitelinks'] = True
+                    self.score += 10
+                else:
+                    self.google_data['has_sitelinks'] = False
+                    self.issues.append("No sitelinks in Google results")
         except Exception as e:
             self.issues.append(f"Failed to check sitelinks: {str(e)}")
 
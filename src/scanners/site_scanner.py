@@ -0,0 +1,76 @@
+import aiohttp
+from bs4 import BeautifulSoup
+from concurrent.futures import Executor
+from typing import Dict, Optional
+from scanners.contact_scanner import ContactScanner, extract_page, empty_contacts
+from scanners.seo_scanner import SEOScanner, MAX_TIMEOUT
+from scanners.whois_stage import WhoisStage
+from scanners.http_client import PageCache
+from config import HTML_PARSER
+
+def analyze_page(body: bytes, url: str, encoding: Optional[str] = None) -> Dict:
+    """Parse a homepage once and run both the contact and SEO extractors on it.
+
+    Returns extract_page()'s dict plus an 'seo' entry with the issues and
+    score of SEOScanner.check_page(). Runs in a worker process when the
+    scanner has an executor.
+    """
+    soup = BeautifulSoup(body, HTML_PARSER, from_encoding=encoding)
+    page = extract_page(soup, url)
+
+    seo = SEOScanner(url)
+    seo.check_page(soup)
+    page['seo'] = {'issues': seo.issues, 'score': seo.score}
+    return page
+
+class SiteScanner:
+    """Fetch-once, parse-once scan of a site for contacts and SEO.
+
+    The homepage is downloaded and parsed a single time; the contact
+    extractors and the on-page SEO checks share that document and their
+    results are merged into one dict (ContactScanner's keys plus 'seo').
+    """
+
+    def __init__(self, url: str, session: Optional[aiohttp.ClientSession] = None,
+                 executor: Optional[Executor] = None, google_checks: bool = False,
+                 whois_stage: Optional[WhoisStage] = None, page_cache: Optional[PageCache] = None,
+                 crawl: bool = False, whois: bool = True):
+        self.url = url
+        self.session = session
+        self.executor = executor
+        self.whois_stage = whois_stage
+        self.page_cache = page_cache
+        self.google_checks = google_checks  # Custom Search checks cost API quota
+        self.crawl = crawl  # see ContactScanner
+        self.whois = whois  # see ContactScanner
+
+    async def scan(self) -> Dict:
+        if self.session is not None:
+            return await self._scan(self.session)
+        timeout = aiohttp.ClientTimeout(total=MAX_TIMEOUT)
+        async with aiohttp.ClientSession(timeout=timeout) as session:
+            return await self._scan(session)
+
+    async def _scan(self, session: aiohttp.ClientSession) -> Dict:
+        contact_scanner = ContactScanner(self.url, session=session, executor=self.executor,
+                                         whois_stage=self.whois_stage, page_cache=self.page_cache,
+                                         crawl=self.crawl, whois=self.whois)
+        seo_scanner = SEOScanner(self.url, session=session, page_cache=self.page_cache)
+
+        try:
+            page = await contact_scanner.fetch_and_parse(session, self.url, parser=analyze_page)
+        except Exception as e:
+            print(f"Error scanning {self.url}: {str(e)}")
+            results = empty_contacts()
+            results['error'] = str(e)
+            results['seo'] = {'issues': [f"Failed to scan: {str(e)}"], 'score': 0, 'google_data': {}}
+            return results
+
+        if page is None:
+            results = empty_contacts()
+            results['seo'] = {'issues': ["Failed to scan: homepage did not return a 200 HTML response"], 'score': 0, 'google_data': {}}
+            return results
+
+        results = await contact_scanner.scan(page=page)
+        results['seo'] = await seo_scanner.scan(checked=page['seo'], google=self.google_checks)
+        return results
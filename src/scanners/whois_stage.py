@@ -0,0 +1,120 @@
+import asyncio
+import ipaddress
+import time
+import whois
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, datetime
+from typing import Dict
+from cache import DiskCache
+from config import (
+    WHOIS_CACHE_PATH, WHOIS_CACHE_TTL, WHOIS_NEGATIVE_TTL,
+    WHOIS_WORKERS, WHOIS_QUERIES_PER_SECOND
+)
+
+# Second-level suffixes where the registrable domain has three labels
+MULTI_LABEL_SUFFIXES = {
+    'co.uk', 'org.uk', 'ac.uk', 'gov.uk', 'me.uk', 'ltd.uk', 'plc.uk',
+    'com.au', 'net.au', 'org.au', 'co.nz', 'org.nz', 'co.za',
+    'com.br', 'com.mx', 'com.cn', 'co.jp', 'co.in', 'co.kr', 'com.sg'
+}
+
+def registrable_domain(host: str) -> str:
+    """Reduce a host (optionally with port) to the domain a registrar holds"""
+    host = host.lower().split(':')[0].strip('.')
+    try:
+        ipaddress.ip_address(host)
+        return host
+    except ValueError:
+        pass
+    labels = host.split('.')
+    if len(labels) > 2 and '.'.join(labels[-2:]) in MULTI_LABEL_SUFFIXES:
+        return '.'.join(labels[-3:])
+    return '.'.join(labels[-2:])
+
+def _to_json(value):
+    """Make WHOIS fields JSON-safe so cached and fresh results look the same"""
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    if isinstance(value, (list, tuple)):
+        return [_to_json(v) for v in value]
+    return value
+
+def fetch_whois(domain: str) -> Dict:
+    """Blocking WHOIS query over port 43"""
+    w = whois.whois(domain)
+    return {
+        'registrar': _to_json(w.registrar),
+        'creation_date': _to_json(w.creation_date),
+        'emails': _to_json(w.emails)
+    }
+
+class WhoisStage:
+    """WHOIS lookups off the event loop, rate limited and cached on disk.
+
+    Queries run on a bounded thread pool, spaced per registry (TLD) by
+    WHOIS_QUERIES_PER_SECOND. Results, including failures, are cached by
+    registrable domain so rescans never hit port 43 for a known domain.
+    Concurrent lookups for the same domain share one query. Cache reads
+    and writes run on a thread so SQLite never blocks the event loop.
+    """
+
+    def __init__(self, cache_path: str = WHOIS_CACHE_PATH, ttl: float = WHOIS_CACHE_TTL,
+                 negative_ttl: float = WHOIS_NEGATIVE_TTL, max_workers: int = WHOIS_WORKERS,
+                 queries_per_second: Dict[str, float] = WHOIS_QUERIES_PER_SECOND):
+        self.cache = DiskCache(cache_path, ttl=ttl)
+        self.negative_ttl = negative_ttl
+        self.queries_per_second = queries_per_second
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='whois')
+        self._pending: Dict[str, asyncio.Future] = {}
+        self._registry_locks: Dict[str, asyncio.Lock] = {}
+        self._next_slot: Dict[str, float] = {}
+        self.hits = 0
+        self.misses = 0
+
+    async def __aenter__(self) -> 'WhoisStage':
+        return self
+
+    async def __aexit__(self, *exc_info):
+        self.close()
+
+    def close(self):
+        self._executor.shutdown(wait=False, cancel_futures=True)
+        self.cache.close()
+
+    async def lookup(self, host: str) -> Dict:
+        """WHOIS info for `host`, or {} if the lookup failed"""
+        domain = registrable_domain(host)
+        cached = await asyncio.to_thread(self.cache.get, domain)
+        if cached is not None:
+            self.hits += 1
+            return cached
+
+        pending = self._pending.get(domain)
+        if pending is None:
+            self.misses += 1
+            pending = asyncio.ensure_future(self._query(domain))
+            self._pending[domain] = pending
+            pending.add_done_callback(lambda _: self._pending.pop(domain, None))
+        return await asyncio.shield(pending)
+
+    async def _query(self, domain: str) -> Dict:
+        await self._throttle(domain.rsplit('.', 1)[-1])
+        loop = asyncio.get_running_loop()
+        try:
+            info = await loop.run_in_executor(self._executor, fetch_whois, domain)
+        except Exception as e:
+            print(f"WHOIS lookup failed for {domain}: {str(e)}")
+            await asyncio.to_thread(self.cache.set, domain, {}, ttl=self.negative_ttl)
+            return {}
+        await asyncio.to_thread(self.cache.set, domain, info)
+        return info
+
+    async def _throttle(self, registry: str):
+        """Space queries to the same registry by its allowed rate"""
+        rate = self.queries_per_second.get(registry, self.queries_per_second['default'])
+        lock = self._registry_locks.setdefault(registry, asyncio.Lock())
+        async with lock:
+            wait = self._next_slot.get(registry, 0.0) - time.monotonic()
+            if wait > 0:
+                await asyncio.sleep(wait)
+            self._next_slot[registry] = time.monotonic() + 1.0 / rate
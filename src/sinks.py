@@ -0,0 +1,178 @@
+import asyncio
+import csv
+import json
+import threading
+import time
+from datetime import datetime
+from typing import Dict, List
+from database import Database
+
+CSV_FIELDS = [
+    'url', 'emails', 'phones', 'contact_page', 'business_hours', 'social_media',
+    'forms_count', 'whois_registrar', 'whois_emails', 'seo_score', 'seo_issues'
+]
+
+def flatten_result(r: Dict) -> Dict:
+    """One CSV row per scan result"""
+    return {
+        'url': r.get('url', ''),
+        'emails': ', '.join(r.get('emails', [])),
+        'phones': ', '.join(r.get('phones', [])),
+        'contact_page': r.get('contact_page', ''),
+        'business_hours': r.get('business_hours', ''),
+        'social_media': ', '.join([f"{s['platform']}: {s['url']}" for s in r.get('social_media', [])]),
+        'forms_count': len(r.get('forms', [])),
+        'whois_registrar': r.get('whois_info', {}).get('registrar', ''),
+        'whois_emails': ', '.join(r.get('whois_info', {}).get('emails', []) or []),
+        'seo_score': r.get('seo', {}).get('score', ''),
+        'seo_issues': '; '.join(r.get('seo', {}).get('issues', []))
+    }
+
+def to_document(r: Dict) -> Dict:
+    """Shape a scan result like the documents view_results reads"""
+    seo = r.get('seo', {})
+    return {
+        'url': r.get('url'),
+        'scan_date': datetime.now(),
+        'scan_results': {
+            'score': seo.get('score', 0),
+            'issues': seo.get('issues', []),
+            'google_data': seo.get('google_data', {}),
+            'contacts': {
+                'emails': r.get('emails', []),
+                'phones': r.get('phones', []),
+                'social_media': r.get('social_media', []),
+                'contact_page': r.get('contact_page'),
+                'forms': r.get('forms', []),
+                'business_hours': r.get('business_hours')
+            },
+            'whois_info': r.get('whois_info', {}),
+            'error': r.get('error')
+        }
+    }
+
+class ResultSink:
+    """Writes scan results as they complete.
+
+    Results are buffered and flushed once `batch_size` are pending or
+    `flush_interval` seconds have passed, so memory stays bounded and the
+    output is readable while the scan runs. Inside an event loop use
+    write_async() and flush_periodically(): flushes then run on a worker
+    thread, so a slow write (a MongoDB round-trip) never stalls the scan,
+    and a quiet stretch doesn't hold results back. write() and flush() are
+    the synchronous equivalents. Subclasses implement _write().
+    """
+
+    def __init__(self, batch_size: int = 100, flush_interval: float = 5.0):
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.written = 0
+        self._buffer: List[Dict] = []
+        self._last_flush = time.monotonic()
+        self._write_lock = threading.Lock()  # one _write at a time, in order
+        self._flush_lock = asyncio.Lock()
+
+    def __enter__(self) -> 'ResultSink':
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def seconds_until_flush(self) -> float:
+        return self._last_flush + self.flush_interval - time.monotonic()
+
+    def _due(self) -> bool:
+        return len(self._buffer) >= self.batch_size or self.seconds_until_flush() <= 0
+
+    def write(self, result: Dict):
+        self._buffer.append(result)
+        if self._due():
+            self.flush()
+
+    async def write_async(self, result: Dict):
+        self._buffer.append(result)
+        if self._due():
+            await self.flush_async()
+
+    async def flush_periodically(self):
+        """Flush every `flush_interval` seconds until cancelled"""
+        while True:
+            await asyncio.sleep(max(self.seconds_until_flush(), 0.1))
+            if self.seconds_until_flush() <= 0:
+                await self.flush_async()
+
+    def _take(self) -> List[Dict]:
+        batch, self._buffer = self._buffer, []
+        self._last_flush = time.monotonic()
+        return batch
+
+    def _commit(self, batch: List[Dict]):
+        if batch:
+            with self._write_lock:
+                self._write(batch)
+                self.written += len(batch)
+
+    def flush(self):
+        self._commit(self._take())
+
+    async def flush_async(self):
+        """flush() with the write on a worker thread"""
+        async with self._flush_lock:
+            await asyncio.to_thread(self._commit, self._take())
+
+    def _write(self, results: List[Dict]):
+        raise NotImplementedError
+
+    def close(self):
+        self.flush()
+
+class CSVSink(ResultSink):
+    def __init__(self, filename: str, **kwargs):
+        super().__init__(**kwargs)
+        self.filename = filename
+        self._file = open(filename, 'w', newline='', encoding='utf-8')
+        self._writer = csv.DictWriter(self._file, fieldnames=CSV_FIELDS)
+        self._writer.writeheader()
+
+    def _write(self, results: List[Dict]):
+        self._writer.writerows(flatten_result(r) for r in results)
+        self._file.flush()
+
+    def close(self):
+        super().close()
+        self._file.close()
+
+class JSONLSink(ResultSink):
+    def __init__(self, filename: str, **kwargs):
+        super().__init__(**kwargs)
+        self.filename = filename
+        self._file = open(filename, 'w', encoding='utf-8')
+
+    def _write(self, results: List[Dict]):
+        self._file.writelines(json.dumps(r, default=str) + '\n' for r in results)
+        self._file.flush()
+
+    def close(self):
+        super().close()
+        self._file.close()
+
+class MongoSink(ResultSink):
+    """Upserts results into the websites collection, one document per URL"""
+
+    def __init__(self, db: Database = None, **kwargs):
+        super().__init__(**kwargs)
+        self.db = db or Database()
+        self._writer = self.db.bulk_writer(batch_size=self.batch_size)
+
+    def _write(self, results: List[Dict]):
+        for r in results:
+            self._writer.add(to_document(r))
+        self._writer.flush()
+
+def open_sink(target: str, **kwargs) -> ResultSink:
+    """Pick a sink from the output target: 'mongodb', *.jsonl, or CSV"""
+    if target == 'mongodb':
+        return MongoSink(**kwargs)
+    if target.endswith('.jsonl'):
+        return JSONLSink(target, **kwargs)
+    return CSVSink(target, **kwargs)
@@ -28,43 +28,59 @@ def format_scan_results(website_data):
     
     print(f"{'='*80}\n")
 
-def view_all_results():
+SUMMARY_PAGE_SIZE = 50
+
+DETAIL_PROJECTION = {
+    'url': 1, 'scan_date': 1,
+    'scan_results.score': 1, 'scan_results.issues': 1, 'scan_results.google_data': 1
+}
+
+EXPORT_PROJECTION = {
+    'url': 1, 'scan_date': 1, 'business_name': 1, 'location': 1,
+    'scan_results.score': 1, 'scan_results.issues': 1, 'scan_results.flag_reason': 1,
+    'scan_results.contacts.emails': 1, 'scan_results.contacts.phones': 1,
+    'scan_results.contacts.social_media.platform': 1
+}
+
+def format_date(value, default='Unknown'):
+    return value.strftime("%Y-%m-%d %H:%M") if isinstance(value, datetime) else default
+
+def print_summary(summaries, page_size: int = SUMMARY_PAGE_SIZE):
+    """Print the summary table `page_size` rows at a time"""
+    page = []
+    for summary in summaries:
+        page.append([
+            summary.get('url'),
+            summary['score'],
+            summary['issues'],
+            format_date(summary.get('scan_date'))
+        ])
+        if len(page) == page_size:
+            print(tabulate(page, headers=['URL', 'Score', 'Issues', 'Scan Date'], tablefmt='grid'))
+            page = []
+    if page:
+        print(tabulate(page, headers=['URL', 'Score', 'Issues', 'Scan Date'], tablefmt='grid'))
+
+def view_all_results(page_size: int = SUMMARY_PAGE_SIZE):
     db = Database()
-    websites = db.get_all_websites()
     
-    if not websites:
+    if not db.count_websites():
         print("No scan results found in database!")
         return
     
-    # Summary table
-    summary_data = []
-    for website in websites:
-        scan_results = website.get('scan_results', {})
-        summary_data.append([
-            website.get('url'),
-            scan_results.get('score', 0),
-            len(scan_results.get('issues', [])),
-            website.get('scan_date', 'Unknown').strftime("%Y-%m-%d %H:%M")
-        ])
-    
-    # Print summary table
+    # Summary table, projected and sorted by the server
     print("\n📊 Summary of All Scans")
-    print(tabulate(
-        summary_data,
-        headers=['URL', 'Score', 'Issues', 'Scan Date'],
-        tablefmt='grid'
-    ))
+    print_summary(db.iter_summaries(), page_size)
     
     # Detailed results
     print("\n🔍 Detailed Results")
-    for website in websites:
+    for website in db.iter_websites(DETAIL_PROJECTION, sort=[('scan_date', -1)]):
         format_scan_results(website)
 
 def export_to_csv(filename: str = "scan_results.csv"):
     db = Database()
-    websites = db.get_all_websites()
     
-    if not websites:
+    if not db.count_websites():
         print("No data to export!")
         return
         
@@ -85,7 +101,7 @@ def export_to_csv(filename: str = "scan_results.csv"):
         ])
         
         # Write data
-        for website in websites:
+        for website in db.iter_websites(EXPORT_PROJECTION):
             scan_results = website.get('scan_results', {})
             contacts = scan_results.get('contacts', {})
             
@@ -98,11 +114,11 @@ def export_to_csv(filename: str = "scan_results.csv"):
                 ', '.join(contacts.get('phones', [])),
                 ', '.join([s['platform'] for s in contacts.get('social_media', [])]),
                 '; '.join(scan_results.get('issues', [])),
-                website.get('scan_date', datetime.now()).strftime("%Y-%m-%d %H:%M"),
+                format_date(website.get('scan_date'), format_date(datetime.now())),
                 scan_results.get('flag_reason', '')
             ])
     
     print(f"Results exported to {filename}")
 
 if __name__ == "__main__":
-    view_all_results() 
\ No newline at end of file
+    view_all_results()
\ No newline at end of file
@@ -0,0 +1,163 @@
+import asyncio
+import hashlib
+import json
+import time
+import aiohttp
+from typing import AsyncIterator, Dict, Optional
+from cache import DiskCache
+from config import (
+    YELP_QPS, YELP_DAILY_QUOTA, YELP_MAX_CONNECTIONS, MAX_TIMEOUT,
+    YELP_CACHE_PATH, YELP_CACHE_TTL, YELP_CACHE_MAX_ENTRIES, YELP_CACHE_MODE
+)
+
+YELP_SEARCH_URL = 'https://api.yelp.com/v3/businesses/search'
+YELP_PAGE_SIZE = 50  # largest `limit` the search endpoint accepts
+YELP_MAX_RESULTS = 240  # `offset + limit` may not exceed this
+YELP_MAX_RADIUS = 40000  # meters
+
+CACHE_MODES = ('use', 'refresh', 'only', 'off')
+
+class QuotaExceeded(Exception):
+    pass
+
+def cache_key(endpoint: str, params: Dict) -> str:
+    """Content address for a request: endpoint plus normalized parameters"""
+    normalized = {k: str(v).strip().lower() for k, v in params.items()}
+    digest = hashlib.sha256(json.dumps(normalized, sort_keys=True).encode('utf-8')).hexdigest()
+    return f"{endpoint}:{digest}"
+
+class TokenBucket:
+    """Async token bucket: `rate` requests per second with bursts up to
+    `capacity`, plus a hard cap of `daily_quota` requests."""
+
+    def __init__(self, rate: float, capacity: Optional[float] = None,
+                 daily_quota: Optional[int] = None):
+        self.rate = rate
+        self.capacity = capacity or rate
+        self.daily_quota = daily_quota
+        self.remaining = daily_quota
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    def _refill(self):
+        now = time.monotonic()
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    async def acquire(self):
+        async with self._lock:
+            if self.remaining is not None and self.remaining <= 0:
+                raise QuotaExceeded(f"daily quota of {self.daily_quota} requests used up")
+            self._refill()
+            if self._tokens < 1:
+                await asyncio.sleep((1 - self._tokens) / self.rate)
+                self._refill()
+            self._tokens -= 1
+            if self.remaining is not None:
+                self.remaining -= 1
+
+    def sync_remaining(self, remaining: int):
+        """Trust the server's count of requests left today"""
+        self.remaining = remaining
+
+class YelpClient:
+    """Async Yelp Fusion client sharing one session and one rate limiter.
+
+    All requests wait on a TokenBucket configured to YELP_QPS and
+    YELP_DAILY_QUOTA; the daily count is corrected from Yelp's
+    RateLimit-Remaining header as responses come in.
+
+    Successful responses are cached on disk by their normalized parameters.
+    `cache_mode` is 'use' (read and write), 'refresh' (always query, then
+    overwrite), 'only' (answer from the cache, never spend quota) or 'off'.
+    """
+
+    def __init__(self, api_key: str, qps: float = YELP_QPS, daily_quota: int = YELP_DAILY_QUOTA,
+                 max_connections: int = YELP_MAX_CONNECTIONS, max_retries: int = 3,
+                 cache_mode: str = YELP_CACHE_MODE, cache_path: str = YELP_CACHE_PATH):
+        if cache_mode not in CACHE_MODES:
+            raise ValueError(f"cache_mode must be one of {CACHE_MODES}, got {cache_mode!r}")
+        self.api_key = (api_key or '').strip()
+        self.limiter = TokenBucket(qps, daily_quota=daily_quota)
+        self.max_connections = max_connections
+        self.max_retries = max_retries
+        self.cache_mode = cache_mode
+        self.cache = None
+        if cache_mode != 'off':
+            self.cache = DiskCache(cache_path, ttl=YELP_CACHE_TTL, max_entries=YELP_CACHE_MAX_ENTRIES)
+        self.cache_hits = 0
+        self.cache_misses = 0
+        self._session = None
+
+    async def close(self):
+        if self._session is not None:
+            await self._session.close()
+            self._session = None
+
+    def _get_session(self) -> aiohttp.ClientSession:
+        if self._session is None:
+            self._session = aiohttp.ClientSession(
+                connector=aiohttp.TCPConnector(limit=self.max_connections),
+                timeout=aiohttp.ClientTimeout(total=MAX_TIMEOUT),
+                headers={'Authorization': f'Bearer {self.api_key}'}
+            )
+        return self._session
+
+    async def search(self, params: Dict) -> Optional[Dict]:
+        """GET /businesses/search; returns the JSON body or None on API error"""
+        key = cache_key('businesses/search', params)
+        if self.cache is not None and self.cache_mode != 'refresh':
+            cached = await asyncio.to_thread(self.cache.get, key)
+            if cached is not None:
+                self.cache_hits += 1
+                return cached
+        self.cache_misses += 1
+        if self.cache_mode == 'only':
+            return None
+
+        data = await self._request(params)
+        if data is not None and self.cache is not None:
+            await asyncio.to_thread(self.cache.set, key, data)
+        return data
+
+    async def iter_pages(self, params: Dict, page_size: int = YELP_PAGE_SIZE,
+                         first_page: Optional[Dict] = None) -> AsyncIterator[Dict]:
+        """Walk `offset` pagination, yielding each response body as it arrives.
+
+        Stops at the last page, on an API error, or at YELP_MAX_RESULTS;
+        callers can stop earlier simply by breaking out of the loop.
+        `first_page` is an already fetched offset-0 response to start from.
+        """
+        offset = 0
+        while offset < YELP_MAX_RESULTS:
+            limit = min(page_size, YELP_MAX_RESULTS - offset)
+            if offset == 0 and first_page is not None:
+                data = first_page
+            else:
+                data = await self.search({**params, 'limit': limit, 'offset': offset})
+            if data is None:
+                return
+            yield data
+            businesses = data.get('businesses', [])
+            offset += len(businesses)
+            if len(businesses) < limit or offset >= data.get('total', 0):
+                return
+
+    async def _request(self, params: Dict) -> Optional[Dict]:
+        session = self._get_session()
+        for attempt in range(self.max_retries + 1):
+            await self.limiter.acquire()
+            async with session.get(YELP_SEARCH_URL, params=params) as response:
+                remaining = response.headers.get('RateLimit-Remaining')
+                if remaining is not None and remaining.isdigit():
+                    self.limiter.sync_remaining(int(remaining))
+
+                if response.status == 200:
+                    return await response.json()
+                if response.status != 429 or attempt == self.max_retries:
+                    print(f"  ❌ Yelp API error ({response.status}): {await response.text()}")
+                    return None
+
+            # Per-second limit hit despite the bucket; back off and retry
+            await asyncio.sleep(2 ** attempt)
@@ -0,0 +1,32 @@
+import pytest
+import app as app_module
+from company_index import MAX_PAGE_SIZE
+from lead_store import LeadStore
+
+@pytest.fixture
+def client(tmp_path, monkeypatch):
+    path = str(tmp_path / 'leads.db')
+    with LeadStore(path) as store:
+        store.upsert([{
+            'name': f"Company {i}",
+            'website': f"https://c{i}.example.com",
+            'area': 'San Diego, CA',
+            'type': 'software',
+            'rating': 4.0,
+            'reviews': i
+        } for i in range(600)])
+    monkeypatch.setattr(app_module, 'companies_cache', app_module.CompaniesCache(path))
+    return app_module.app.test_client()
+
+def test_page_and_page_size_are_echoed_as_clamped(client):
+    body = client.get(f'/api/companies?page_size={MAX_PAGE_SIZE * 2}').get_json()
+    assert body['page_size'] == MAX_PAGE_SIZE
+    assert len(body['companies']) == MAX_PAGE_SIZE
+
+    body = client.get('/api/companies?page=0&page_size=0').get_json()
+    assert (body['page'], body['page_size'], len(body['companies'])) == (1, 1, 1)
+
+def test_page_offsets_follow_the_echoed_values(client):
+    body = client.get('/api/companies?page=2&page_size=100&sort=-reviews').get_json()
+    assert (body['page'], body['page_size'], body['total']) == (2, 100, 600)
+    assert body['companies'][0]['reviews'] == 499
@@ -0,0 +1,40 @@
+from cache import DiskCache
+
+def keys(cache: DiskCache):
+    return [key for (key,) in cache._conn.execute('SELECT key FROM cache ORDER BY rowid')]
+
+def test_round_trip_and_expiry(tmp_path):
+    cache = DiskCache(str(tmp_path / 'cache.db'), ttl=60)
+    cache.set('fresh', {'a': [1, 2]})
+    cache.set('stale', 'x', ttl=-1)
+    assert cache.get('fresh') == {'a': [1, 2]}
+    assert cache.get('stale', 'missing') == 'missing'
+    assert keys(cache) == ['fresh']  # expired entries are deleted on read
+
+def test_evicts_oldest_writes_beyond_max_entries(tmp_path):
+    cache = DiskCache(str(tmp_path / 'cache.db'), max_entries=3)
+    for key in 'abcd':
+        cache.set(key, key)
+    assert keys(cache) == ['b', 'c', 'd']
+
+def test_rewriting_a_key_makes_it_newest(tmp_path):
+    cache = DiskCache(str(tmp_path / 'cache.db'), max_entries=3)
+    for key in 'abc':
+        cache.set(key, key)
+    cache.set('a', 'again')
+    cache.set('d', 'd')
+    assert keys(cache) == ['c', 'a', 'd']
+
+def test_expired_entries_are_evicted_first(tmp_path):
+    cache = DiskCache(str(tmp_path / 'cache.db'), max_entries=3)
+    cache.set('a', 'a')
+    cache.set('old', 'x', ttl=-1)
+    cache.set('b', 'b')
+    cache.set('c', 'c')
+    assert keys(cache) == ['a', 'b', 'c']
+
+def test_set_many_writes_one_batch(tmp_path):
+    cache = DiskCache(str(tmp_path / 'cache.db'), ttl=60, max_entries=3)
+    cache.set_many({key: key.upper() for key in 'abcd'})
+    assert keys(cache) == ['b', 'c', 'd']
+    assert cache.get('d') == 'D'
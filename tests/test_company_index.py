@@ -0,0 +1,68 @@
+import random
+import pytest
+from company_index import CompaniesIndex, MAX_PAGE_SIZE
+
+AREAS = ['San Diego, CA', 'La Jolla, CA', 'Del Mar, CA']
+TYPES = ['dentist', 'law firm', 'software', None]
+
+@pytest.fixture(scope='module')
+def companies():
+    rng = random.Random(7)
+    return [{
+        'name': f"Company {rng.randrange(10000)}",
+        'website': f"https://c{i}.example.com",
+        'area': rng.choice(AREAS),
+        'type': rng.choice(TYPES),
+        'rating': rng.choice([None, 3.0, 3.5, 4.0, 4.5, 5.0]),
+        'reviews': rng.randrange(0, 500)
+    } for i in range(1000)]
+
+@pytest.fixture(scope='module')
+def index(companies):
+    return CompaniesIndex(companies)
+
+def brute_force(companies, page, page_size, sort, area=None, type=None,
+                min_rating=None, min_reviews=None):
+    key = sort.lstrip('-')
+    rows = [c for c in companies
+            if (area is None or c['area'] == area)
+            and (type is None or (c['type'] or '') == type)
+            and (min_rating is None or (c['rating'] or 0) >= min_rating)
+            and (min_reviews is None or c['reviews'] >= min_reviews)]
+    value = (lambda c: c[key] or 0) if key in ('rating', 'reviews') else (lambda c: (c[key] or '').lower())
+    rows.sort(key=value, reverse=sort.startswith('-'))
+    offset = (page - 1) * page_size
+    return rows[offset:offset + page_size], len(rows)
+
+@pytest.mark.parametrize('sort', ['-reviews', 'reviews', 'name', '-rating', 'area'])
+@pytest.mark.parametrize('filters', [
+    {},
+    {'area': 'La Jolla, CA'},
+    {'type': 'software', 'min_rating': 4.0},
+    {'min_reviews': 250},
+    {'area': 'Nowhere'}
+])
+def test_query_matches_brute_force(companies, index, sort, filters):
+    for page in (1, 2, 7):
+        result = index.query(page=page, page_size=25, sort=sort, **filters)
+        expected, total = brute_force(companies, page, 25, sort, **filters)
+        key = sort.lstrip('-')
+        # Ties may come back in any order; compare the sort values and the totals
+        assert [c[key] for c in result.companies] == [c[key] for c in expected]
+        assert result.total == total
+        assert all(c in companies for c in result.companies)
+
+def test_query_clamps_page_and_page_size(index):
+    assert len(index.query(page=0, page_size=10).companies) == 10
+    assert index.query(page=0, page_size=10) == index.query(page=1, page_size=10)
+    assert len(index.query(page_size=MAX_PAGE_SIZE + 100).companies) == MAX_PAGE_SIZE
+    assert index.query(page=1000).companies == []
+
+def test_unknown_sort_key_is_rejected(index):
+    with pytest.raises(ValueError):
+        index.query(sort='-website')
+
+def test_iter_matches_and_facets(companies, index):
+    matched = list(index.iter_matches(area='Del Mar, CA', min_reviews=100))
+    assert matched == [c for c in companies if c['area'] == 'Del Mar, CA' and c['reviews'] >= 100]
+    assert index.facets()['areas'] == sorted(AREAS)
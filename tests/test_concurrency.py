@@ -0,0 +1,44 @@
+from concurrency import AdaptiveLimiter
+
+def window(limiter, completed, errors=0, saturated=True, lag=0.0):
+    """Feed one control window to the limiter and return the new limit"""
+    limiter._completed = completed
+    limiter._errors = errors
+    limiter._saturated = saturated
+    limiter._max_lag = lag
+    limiter._adjust()
+    return limiter.limit
+
+def test_grows_by_one_while_saturated():
+    limiter = AdaptiveLimiter(initial=5, interval=1.0)
+    assert [window(limiter, 10), window(limiter, 11), window(limiter, 12)] == [6, 7, 8]
+    assert limiter.peak == 8
+
+def test_holds_when_not_saturated():
+    limiter = AdaptiveLimiter(initial=5, interval=1.0)
+    assert window(limiter, 10, saturated=False) == 5
+
+def test_halves_on_errors_or_loop_lag():
+    limiter = AdaptiveLimiter(initial=20, interval=1.0)
+    assert window(limiter, 10, errors=5) == 10
+    assert window(limiter, 10, lag=1.0) == 5
+
+def test_never_leaves_bounds():
+    limiter = AdaptiveLimiter(initial=2, minimum=2, maximum=3, interval=1.0)
+    assert window(limiter, 10, errors=10) == 2
+    assert window(limiter, 10) == 3
+    assert window(limiter, 11) == 3
+
+def test_throughput_drop_steps_back_only_after_growing():
+    limiter = AdaptiveLimiter(initial=5, interval=1.0)
+    window(limiter, 10)  # grows to 6
+    assert window(limiter, 5) == 5  # the growth hurt, undo it
+    assert window(limiter, 2) == 5  # a drop without growth leaves it
+
+def test_drained_freezes_and_reports_the_settled_limit():
+    limiter = AdaptiveLimiter(initial=5, interval=1.0)
+    window(limiter, 10)
+    window(limiter, 11)
+    limiter.drained()
+    assert window(limiter, 1, errors=1) == 7
+    assert limiter.summary().startswith("Concurrency settled at 7 ")
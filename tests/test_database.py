@@ -0,0 +1,57 @@
+from datetime import datetime
+import mongomock
+import pytest
+from config import DB_NAME
+from database import Database
+
+@pytest.fixture
+def client():
+    return mongomock.MongoClient()
+
+@pytest.fixture
+def db(client):
+    return Database(client=client)
+
+def test_bulk_writer_waits_for_a_full_batch(db):
+    writer = db.bulk_writer(batch_size=3, flush_interval=3600)
+    writer.add({'url': 'https://a.com', 'score': 1})
+    writer.add({'url': 'https://b.com', 'score': 2})
+    assert db.websites.count_documents({}) == 0
+
+    writer.add({'url': 'https://c.com', 'score': 3})
+    assert db.websites.count_documents({}) == 3
+    assert writer.upserted == 3
+
+def test_bulk_writer_collapses_repeated_urls(db):
+    with db.bulk_writer(batch_size=10, flush_interval=3600) as writer:
+        writer.add({'url': 'https://a.com', 'score': 1})
+        writer.add({'url': 'https://a.com', 'score': 5})
+    assert db.websites.count_documents({}) == 1
+    assert db.get_website('https://a.com')['score'] == 5
+
+def test_bulk_writer_updates_existing_documents(db):
+    db.save_website({'url': 'https://a.com', 'score': 1, 'owner': 'kept'})
+    with db.bulk_writer(batch_size=10, flush_interval=3600) as writer:
+        writer.add({'url': 'https://a.com', 'score': 2})
+    doc = db.get_website('https://a.com')
+    assert (doc['score'], doc['owner']) == (2, 'kept')
+    assert writer.modified == 1
+    assert db.websites.count_documents({}) == 1
+
+def test_indexing_removes_duplicates_keeping_newest(client):
+    client[DB_NAME].websites.insert_many([
+        {'url': 'https://a.com', 'scan_date': datetime(2024, 1, 1), 'score': 1},
+        {'url': 'https://a.com', 'scan_date': datetime(2024, 3, 1), 'score': 3},
+        {'url': 'https://a.com', 'scan_date': datetime(2024, 2, 1), 'score': 2},
+        {'url': 'https://b.com', 'scan_date': datetime(2024, 1, 1), 'score': 4}
+    ])
+    db = Database(client=client)
+    assert db.websites.count_documents({}) == 2
+    assert db.get_website('https://a.com')['score'] == 3
+
+def test_save_website_upserts_by_url(db):
+    first = db.save_website({'url': 'https://a.com', 'score': 1})
+    second = db.save_website({'url': 'https://a.com', 'score': 2})
+    assert first == second
+    assert db.websites.count_documents({}) == 1
+    assert db.get_website('https://a.com')['score'] == 2
@@ -0,0 +1,52 @@
+import json
+from journal import ScanJournal
+
+def write(path, text):
+    with open(path, 'w', encoding='utf-8') as f:
+        f.write(text)
+
+def read(path):
+    with open(path, encoding='utf-8') as f:
+        return f.read()
+
+def test_truncate_cuts_a_torn_last_line(tmp_path):
+    path = tmp_path / 'journal.jsonl'
+    write(path, '{"url": "a"}\n{"url": "b"}\n{"url": "c", "ema')
+    ScanJournal(str(path))._truncate_torn_tail()
+    assert read(path) == '{"url": "a"}\n{"url": "b"}\n'
+
+def test_truncate_keeps_a_complete_journal(tmp_path):
+    path = tmp_path / 'journal.jsonl'
+    write(path, '{"url": "a"}\n')
+    ScanJournal(str(path))._truncate_torn_tail()
+    assert read(path) == '{"url": "a"}\n'
+
+def test_truncate_empties_a_journal_without_newlines(tmp_path):
+    path = tmp_path / 'journal.jsonl'
+    write(path, '{"url": "a", "ph')
+    ScanJournal(str(path))._truncate_torn_tail()
+    assert read(path) == ''
+
+def test_truncate_searches_back_past_one_chunk(tmp_path):
+    path = tmp_path / 'journal.jsonl'
+    write(path, '{"url": "a"}\n' + 'x' * 10000)
+    ScanJournal(str(path))._truncate_torn_tail()
+    assert read(path) == '{"url": "a"}\n'
+
+def test_resume_appends_after_a_torn_line(tmp_path):
+    path = tmp_path / 'journal.jsonl'
+    write(path, '{"url": "a"}\n{"url": "b", "err')
+    with ScanJournal(str(path)) as journal:
+        journal.open(resume=True)
+        journal.record({'url': 'c'})
+    assert [json.loads(line)['url'] for line in read(path).splitlines()] == ['a', 'c']
+    assert ScanJournal(str(path)).completed_urls() == {'a', 'c'}
+
+def test_unreachable_results_are_not_completed(tmp_path):
+    path = tmp_path / 'journal.jsonl'
+    with ScanJournal(str(path)) as journal:
+        journal.open()
+        journal.record({'url': 'a', 'error': 'unreachable (dns)'})
+        journal.record({'url': 'b', 'error': 'invalid URL'})
+        journal.record({'url': 'c'})
+    assert ScanJournal(str(path)).completed_urls() == {'b', 'c'}
@@ -0,0 +1,40 @@
+import asyncio
+import time
+import pytest
+from yelp_client import QuotaExceeded, TokenBucket, cache_key
+
+def acquire_times(bucket: TokenBucket, count: int):
+    """Seconds after the start at which each of `count` acquires returned"""
+    async def run():
+        start = time.monotonic()
+        times = []
+        for _ in range(count):
+            await bucket.acquire()
+            times.append(time.monotonic() - start)
+        return times
+    return asyncio.run(run())
+
+def test_burst_up_to_capacity_then_paced():
+    times = acquire_times(TokenBucket(rate=20, capacity=3), 5)
+    assert times[2] < 0.03  # the burst is immediate
+    assert times[3] >= 0.04  # then one token every 1/rate seconds
+    assert times[4] - times[3] >= 0.04
+
+def test_daily_quota_is_enforced():
+    bucket = TokenBucket(rate=1000, daily_quota=2)
+    acquire_times(bucket, 2)
+    assert bucket.remaining == 0
+    with pytest.raises(QuotaExceeded):
+        acquire_times(bucket, 1)
+
+def test_server_count_overrides_local_quota():
+    bucket = TokenBucket(rate=1000, daily_quota=100)
+    bucket.sync_remaining(0)
+    with pytest.raises(QuotaExceeded):
+        acquire_times(bucket, 1)
+
+def test_cache_key_ignores_order_case_and_whitespace():
+    assert (cache_key('businesses/search', {'term': ' Dentist', 'radius': 40000}) ==
+            cache_key('businesses/search', {'radius': '40000', 'term': 'dentist '}))
+    assert (cache_key('businesses/search', {'term': 'dentist'}) !=
+            cache_key('businesses/search', {'term': 'lawyer'}))